@@ -0,0 +1,15 @@
+USE [AuditReport];
+GO
+
+-- Keyset index for the Audit Report preview.
+-- get_audit_page reads the window one page at a time in (TimeStmp, id)
+-- order, starting right after the last row of the previous page; with this
+-- index every page is a short range seek, however far into the window it is.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_AuditReport_TimeStmp_id'
+                 AND object_id = OBJECT_ID('dbo.AuditReport'))
+    CREATE NONCLUSTERED INDEX IX_AuditReport_TimeStmp_id
+        ON [dbo].[AuditReport] (TimeStmp, id)
+        INCLUDE (MessageText, UserID);
+GO
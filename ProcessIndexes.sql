@@ -0,0 +1,36 @@
+USE [ParReport];
+GO
+
+-- Window index for the Process Report.
+-- get_report_data filters FloatTable/StringTable on DateAndTime before
+-- pivoting; with these indexes that is a range seek instead of a full scan.
+-- No hint forces them: the optimizer uses them once they exist, and the
+-- report still runs (slower) without them.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_FloatTable_DateAndTime_TagIndex'
+                 AND object_id = OBJECT_ID('dbo.FloatTable'))
+    CREATE NONCLUSTERED INDEX IX_FloatTable_DateAndTime_TagIndex
+        ON [dbo].[FloatTable] (DateAndTime, TagIndex)
+        INCLUDE (Val);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_StringTable_DateAndTime_TagIndex'
+                 AND object_id = OBJECT_ID('dbo.StringTable'))
+    CREATE NONCLUSTERED INDEX IX_StringTable_DateAndTime_TagIndex
+        ON [dbo].[StringTable] (DateAndTime, TagIndex)
+        INCLUDE (Val);
+GO
+
+-- Batch index (reports/batch_index.py): the Batch ID is TagIndex 1 of
+-- StringTable. Keyed on TagIndex first, the scan of its changes reads only
+-- the Batch ID rows instead of the whole table.
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_StringTable_TagIndex_DateAndTime'
+                 AND object_id = OBJECT_ID('dbo.StringTable'))
+    CREATE NONCLUSTERED INDEX IX_StringTable_TagIndex_DateAndTime
+        ON [dbo].[StringTable] (TagIndex, DateAndTime)
+        INCLUDE (Val);
+GO
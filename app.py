@@ -1,6 +1,5 @@
 # app.py
 import streamlit as st
-from reports import process_report, audit_report, alarm_report
 import json
 
 st.set_page_config(page_title="Reporting System", layout="wide")
@@ -60,11 +59,18 @@ if st.sidebar.button("Alarm Report"):
 
 
 # --- render the chosen report ---
+# each report is imported the first time it is picked, not on every start.
+# The *_report pages are only the UI: data and PDF code live in the UI-free
+# *_data/*_pdf modules (also used by cli.py), and reportlab is only imported
+# once a report is generated.
 if st.session_state.report_type == "Process Report":
+    from reports import process_report
     process_report.show(databases)
 elif st.session_state.report_type == "Audit Report":
+    from reports import audit_report
     audit_report.show(databases)
 elif st.session_state.report_type == "Alarm Report":
+    from reports import alarm_report
     alarm_report.show(databases)
 else:
     st.info("Please select a report from the sidebar.")
@@ -0,0 +1,91 @@
+# benchmarks/bench_audit_widths.py
+"""
+Audit PDF table preparation (column widths + row wrapping) before and after
+the text_width change, at 1k / 10k / 100k rows.
+
+    python benchmarks/bench_audit_widths.py [rows ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph
+
+from reports.audit_pdf import (
+    EXPAND_COL_INDEX, LEFT, PAGE_SIZE, RIGHT,
+    _audit_col_widths, _cell_style, _wrap_rows,
+)
+from reports.text_width import text_width
+
+
+def audit_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 30 * 86400, rows)), unit='s')
+    users = np.array(['operator1', 'operator2', 'supervisor', 'qa.reviewer', 'maint'])
+    actions = np.array(['Setpoint changed for', 'Alarm acknowledged on', 'Login from',
+                        'Recipe downloaded to', 'Mode switched to AUTO on'])
+    tags = rng.integers(1, 500, rows).astype(str)
+    return pd.DataFrame({
+        'Date': ts.strftime('%d-%m-%Y'),
+        'Time': ts.strftime('%H:%M:%S'),
+        'MessageText': np.char.add(np.char.add(actions[rng.integers(0, 5, rows)], ' TAG-'), tags),
+        'UserID': users[rng.integers(0, 5, rows)],
+    })
+
+
+def legacy_prepare(df, style_normal):
+    """The previous code: a Canvas per cell, then iterrows."""
+    col_widths = []
+    for col in df.columns:
+        max_text_width = max(
+            canvas.Canvas('').stringWidth(str(val), 'Helvetica', 7)
+            for val in df[col].astype(str).tolist()
+        )
+        col_widths.append(max(max_text_width + 10, 20*mm))
+    fixed_width_sum = sum(col_widths[:EXPAND_COL_INDEX] + col_widths[EXPAND_COL_INDEX+1:])
+    col_widths[EXPAND_COL_INDEX] = max(30*mm, PAGE_SIZE[0] - LEFT - RIGHT - fixed_width_sum)
+
+    data = [df.columns.tolist()]
+    for _, row in df.iterrows():
+        wrapped_row = []
+        for i, val in enumerate(row):
+            if i == EXPAND_COL_INDEX:
+                wrapped_row.append(Paragraph(str(val), style_normal))
+            else:
+                wrapped_row.append(str(val))
+        data.append(wrapped_row)
+    return col_widths, data
+
+
+def current_prepare(df, style_normal):
+    col_widths = _audit_col_widths(df)
+    data = [df.columns.tolist()] + _wrap_rows(df.astype(str).values.tolist(), style_normal)
+    return col_widths, data
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def main(row_counts):
+    style_normal = _cell_style()
+    print(f"{'rows':>7} {'legacy s':>9} {'new s':>7} {'speed-up':>8}  widths match")
+    for rows in row_counts:
+        df = audit_frame(rows)
+        text_width.cache_clear()   # measure cold, as on a fresh server
+        t_old, (w_old, _) = timed(legacy_prepare, df, style_normal)
+        t_new, (w_new, _) = timed(current_prepare, df, style_normal)
+        print(f"{rows:>7} {t_old:>9.2f} {t_new:>7.2f} {t_old / t_new:>7.1f}x  "
+              f"{np.allclose(w_old, w_new)}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,101 @@
+# benchmarks/bench_fetch.py
+"""
+Row decode of a wide Process pull: pd.read_sql on a raw DB-API connection
+against reports.fetch.read_frame, on an in-memory cursor shaped like the
+46-tag pivot (DateAndTime, Batch ID, User ID + 46 float columns).
+
+No database needed; this measures only the Python side of the fetch.
+
+    python benchmarks/bench_fetch.py [rows ...]
+"""
+import datetime as _dt
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+import pandas as pd
+
+from reports.fetch import read_frame
+
+TAGS = 46
+
+
+class FakeCursor:
+    def __init__(self, rows, description):
+        self._rows = rows
+        self._pos = 0
+        self.description = description
+        self.arraysize = 1
+
+    def execute(self, query, params=None):
+        self._pos = 0
+        return self
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        batch = self._rows[self._pos:self._pos + size]
+        self._pos += len(batch)
+        return batch
+
+    def fetchall(self):
+        batch = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows, description):
+        self._rows = rows
+        self._description = description
+
+    def cursor(self):
+        return FakeCursor(self._rows, self._description)
+
+    def commit(self):
+        pass
+
+
+def process_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.random((n, TAGS)) * 100, 2)
+    values[rng.random((n, TAGS)) < 0.01] = np.nan
+    start = _dt.datetime(2024, 1, 1)
+    rows = []
+    for i in range(n):
+        vals = [None if v != v else v for v in values[i].tolist()]
+        rows.append((start + _dt.timedelta(minutes=i), 'B-1001', 'operator1', *vals))
+    description = ([('DateAndTime', _dt.datetime), ('Batch ID', str), ('User ID', str)]
+                   + [(f'TT-{i:03d}', float) for i in range(TAGS)])
+    # pyodbc gives 7-item description tuples
+    description = [(name, code, None, None, None, None, True) for name, code in description]
+    return rows, description
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main(row_counts):
+    print(f"{'rows':>8} {'read_sql s':>10} {'read_frame s':>12} {'speed-up':>8}")
+    for n in row_counts:
+        rows, description = process_rows(n)
+        conn = FakeConnection(rows, description)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            t_old, old = timed(lambda: pd.read_sql('SELECT', conn))
+        t_new, new = timed(lambda: read_frame(conn, 'SELECT'))
+        assert old.shape == new.shape
+        print(f"{n:>8} {t_old:>10.2f} {t_new:>12.2f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [10000, 50000, 200000])
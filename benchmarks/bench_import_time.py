@@ -0,0 +1,86 @@
+# benchmarks/bench_import_time.py
+"""
+Cold start and per-rerun cost of the app.
+
+Cold start: each module is imported in a fresh interpreter (median of
+`runs`), with the heavy dependencies it dragged in. The data and PDF
+modules must not load streamlit; the UI modules must not load reportlab,
+sqlalchemy or pyodbc until a report is actually generated.
+
+Per rerun: app.py run through streamlit's AppTest, first run and then
+`runs` reruns with no report picked (no database needed), which is what
+every widget click pays before the report's own code.
+
+    python benchmarks/bench_import_time.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+MODULES = [
+    'reports.process_data', 'reports.alarm_data', 'reports.audit_data',
+    'reports.process_pdf', 'reports.alarm_pdf', 'reports.audit_pdf',
+    'reports.process_report', 'reports.alarm_report', 'reports.audit_report',
+    'cli',
+]
+HEAVY = ('streamlit', 'reportlab', 'sqlalchemy', 'pyodbc', 'openpyxl')
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+print(time.perf_counter() - t0)
+print(' '.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def cold_import(module):
+    """(seconds, heavy modules loaded) for `module` in a fresh interpreter."""
+    out = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+                         cwd=ROOT, capture_output=True, text=True)
+    if out.returncode:
+        return None, out.stderr.strip().splitlines()[-1]
+    seconds, loaded = (out.stdout.splitlines() + [''])[:2]
+    return float(seconds), loaded
+
+
+def app_reruns(runs):
+    from streamlit.testing.v1 import AppTest
+    cwd = os.getcwd()
+    os.chdir(ROOT)   # app.py reads db_config.json and the logo from here
+    try:
+        at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=60)
+        t0 = time.perf_counter()
+        at.run()
+        first = time.perf_counter() - t0
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - t0)
+    finally:
+        os.chdir(cwd)
+    return first, statistics.median(times)
+
+
+def main(runs):
+    print(f"{'module':<24} {'import s':>8}  heavy dependencies loaded")
+    for module in MODULES:
+        results = [cold_import(module) for _ in range(runs)]
+        if results[0][0] is None:
+            print(f"{module:<24} {'failed':>8}  {results[0][1]}")
+            continue
+        seconds = statistics.median(r[0] for r in results)
+        print(f"{module:<24} {seconds:>8.3f}  {results[0][1] or '-'}")
+
+    first, rerun = app_reruns(max(runs, 10))
+    print(f"\napp.py first run {first:.3f} s, rerun {rerun * 1000:.1f} ms (median)")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
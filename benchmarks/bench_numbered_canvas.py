@@ -0,0 +1,82 @@
+# benchmarks/bench_numbered_canvas.py
+"""
+Memory and time of "Page X of Y" numbering against page count.
+
+Compares the old NumberedCanvas (a copy of every page's state kept until
+save) with the current placeholder-form version in reports.report_doc.
+
+    python benchmarks/bench_numbered_canvas.py [pages ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen.canvas import Canvas
+
+from reports.report_doc import NumberedCanvas
+
+
+class SnapshotCanvas(Canvas):
+    """The previous implementation, kept here for comparison."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._saved_page_states = []
+
+    def showPage(self):
+        self._saved_page_states.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total_pages = len(self._saved_page_states)
+        for state in self._saved_page_states:
+            self.__dict__.update(state)
+            self.setFont('Helvetica', 8)
+            self.drawRightString(150 * mm, 10 * mm,
+                                 f"Page {self._pageNumber} of {total_pages}")
+            super().showPage()
+        super().save()
+
+
+def draw_pages(canvas_cls, pages):
+    out = BytesIO()
+    c = canvas_cls(out, pagesize=A4)
+    for p in range(pages):
+        c.setFont('Helvetica', 7)
+        # roughly one page of a dense table
+        for row in range(60):
+            y = 270 * mm - row * 4 * mm
+            for col in range(8):
+                c.drawString(10 * mm + col * 24 * mm, y, f"{p:05d}.{row:02d}.{col}")
+        c.showPage()
+    c.save()
+    return len(out.getvalue())
+
+
+def measure(canvas_cls, pages):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    size = draw_pages(canvas_cls, pages)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main(page_counts):
+    print(f"{'pages':>6} {'canvas':>16} {'time s':>8} {'peak MB':>8} {'pdf KB':>8}")
+    for pages in page_counts:
+        for cls in (SnapshotCanvas, NumberedCanvas):
+            elapsed, peak, size = measure(cls, pages)
+            print(f"{pages:>6} {cls.__name__:>16} {elapsed:>8.2f} "
+                  f"{peak / 2**20:>8.1f} {size / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main([int(a) for a in sys.argv[1:]] or [50, 200, 500])
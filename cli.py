@@ -0,0 +1,233 @@
+# cli.py
+"""
+Reports without the browser, for scheduled shift-end / daily runs and
+re-running a range of past reports. Streamlit is never imported.
+
+    python cli.py process --from "16/10/2026 06:00" --to "17/10/2026 06:00" \
+        --tags "TT-102,PT-118" --interval 10 --format pdf xlsx
+    python cli.py alarm --from 01/10/2026 --to 08/10/2026 --every 24 --workers 4
+    python cli.py audit --from 01/10/2026 --to 01/11/2026 --format csv
+    python cli.py process --batch-id B-1001 --tags "TT-102,PT-118"
+
+Times are plant time (IST), as in the app. --every H cuts the range into
+one report per H hours (24 = daily, 8 = per shift); every (slice, format)
+pair is one task and --workers runs that many at once in separate
+processes. Files go to --out as <report>_<from>_<to>.<format>.
+Printed By is the last user logged in on the plant, as in the app,
+unless --printed-by is given. A process report with --batch-id keeps only
+that batch's rows; without --from/--to it covers the whole batch, as
+found in the batch index (reports/batch_index.py).
+Exit status is 1 if any report failed.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+REPORTS = ('process', 'alarm', 'audit')
+FORMATS = ('pdf', 'csv', 'xlsx', 'parquet')
+DATE_FORMATS = ('%d/%m/%Y %H:%M', '%d/%m/%Y', '%Y-%m-%d %H:%M', '%Y-%m-%d')
+IST_OFFSET = timedelta(hours=5, minutes=30)
+# the queries take both ends inclusively (BETWEEN), so a slice ends this much
+# before the next one starts; 3 ms is the step of a SQL Server datetime
+SLICE_GAP = timedelta(milliseconds=3)
+
+
+def load_db_config(path):
+    with open(path) as config_file:
+        return json.load(config_file).get('databases', {})
+
+
+def parse_time(text):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(
+        f"'{text}' is not a date/time (DD/MM/YYYY [HH:MM] or YYYY-MM-DD [HH:MM])")
+
+
+def time_slices(start, end, every_hours=None):
+    """
+    [(start, end)] covering the range, every_hours long each (one slice if
+    None). Slices don't overlap: a row logged exactly at a boundary (00:00 of
+    a daily run) goes only into the slice that starts there.
+    """
+    if not every_hours:
+        return [(start, end)]
+    step = timedelta(hours=every_hours)
+    slices = []
+    while start < end:
+        next_start = start + step
+        slices.append((start, next_start - SLICE_GAP if next_start < end else end))
+        start = next_start
+    return slices
+
+
+def run_task(task):
+    """
+    One report file: (path, rows), or (None, 0) when there was no data.
+    Runs in a worker process, so everything it needs comes in `task`.
+    """
+    from reports.export import write_export
+    from reports.pdf_stream import STREAMING_MIN_DAYS
+
+    report, fmt, start, end, config, options = task
+    path = os.path.join(options['out'], f"{report}_{start:%Y%m%d_%H%M}_{end:%Y%m%d_%H%M}.{fmt}")
+    params = {
+        "FROM DATE": start.strftime('%d/%m/%Y %H:%M'),
+        "TO DATE": end.strftime('%d/%m/%Y %H:%M'),
+        "Printed By": options['printed_by'],
+    }
+    # Alarm/Audit times are UTC in the database
+    start_utc, end_utc = start - IST_OFFSET, end - IST_OFFSET
+    streaming = end - start > timedelta(days=STREAMING_MIN_DAYS)
+
+    if report == 'process':
+        from reports.process_data import get_report_data, iter_report_data
+        from reports.process_pdf import process_report_pdf
+        from reports.tag_catalog import tag_units
+        tags, interval, aggregation = options['tags'], options['interval'], options['aggregation']
+        if fmt != 'pdf':
+            frames = iter_report_data(start, end, tags, config, interval, aggregation,
+                                      batch_id=options['batch_id'])
+            return _export(write_export, frames, fmt, path)
+        df = get_report_data(start, end, tags, options['batch_id'], config=config,
+                             interval=interval, aggregation=aggregation)
+        if df.empty:
+            return None, 0
+        pdf = process_report_pdf(df, start, end, tags, options['batch_id'],
+                                 options['printed_by'], units=tag_units(config))
+        return _write_bytes(path, pdf), len(df)
+
+    if report == 'alarm':
+        from reports.alarm_data import get_alarm_data as get_data, iter_alarm_data as iter_data
+        from reports.alarm_pdf import (generate_alarm_pdf_report as build_pdf,
+                                       generate_alarm_pdf_report_streaming as stream_pdf)
+    else:
+        from reports.audit_data import get_audit_data as get_data, iter_audit_data as iter_data
+        from reports.audit_pdf import (generate_audit_pdf_report as build_pdf,
+                                       generate_audit_pdf_report_streaming as stream_pdf)
+    if fmt != 'pdf':
+        return _export(write_export, iter_data(start_utc, end_utc, config), fmt, path)
+    if streaming:
+        # long range: rows go from the cursor straight into the PDF file
+        rows = stream_pdf(iter_data(start_utc, end_utc, config), params, path)
+        if not rows:
+            os.remove(path)
+            return None, 0
+        return path, rows
+    df = get_data(start_utc, end_utc, config)
+    if df.empty:
+        return None, 0
+    return _write_bytes(path, build_pdf(df, params)), len(df)
+
+
+def _export(write_export, frames, fmt, path):
+    rows = write_export(frames, fmt, path)
+    if not rows:
+        os.remove(path)
+        return None, 0
+    return path, rows
+
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Generate reports without the web app.")
+    parser.add_argument('report', choices=REPORTS)
+    parser.add_argument('--from', dest='start', type=parse_time)
+    parser.add_argument('--to', dest='end', type=parse_time)
+    parser.add_argument('--format', nargs='+', choices=FORMATS, default=['pdf'])
+    parser.add_argument('--every', type=float, metavar='HOURS',
+                        help="one report per HOURS of the range (default: one report)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="reports generated at once (default 1)")
+    parser.add_argument('--out', default='reports_out', help="output folder")
+    parser.add_argument('--config', default='db_config.json')
+    parser.add_argument('--printed-by', help="default: latest user from the Audit database")
+    process = parser.add_argument_group('process report')
+    process.add_argument('--tags', help="comma separated tag names")
+    process.add_argument('--interval', type=int, default=10, help="minutes (default 10)")
+    process.add_argument('--aggregation', default='first',
+                         choices=('first', 'avg', 'min', 'max'))
+    process.add_argument('--batch-id', default='')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    tags = [t.strip() for t in (args.tags or '').split(',') if t.strip()]
+    if args.report == 'process' and not tags:
+        parser.error("the process report needs --tags")
+    by_batch = args.report == 'process' and args.batch_id.strip()
+    if (args.start is None) != (args.end is None):
+        parser.error("--from and --to go together")
+    if args.start is None and not by_batch:
+        parser.error("--from and --to are needed (or --batch-id for the process report)")
+
+    config = load_db_config(args.config)
+    if args.start is None:
+        from reports.batch_index import batch_window
+        window = batch_window(config, args.batch_id)
+        if window is None:
+            parser.error(f"Batch ID '{args.batch_id}' not found in the historian")
+        args.start, args.end = window
+    if args.end < args.start:
+        parser.error("--to must not be before --from")
+    os.makedirs(args.out, exist_ok=True)
+    printed_by = args.printed_by
+    if printed_by is None:
+        from reports.latest_user import get_latest_user
+        printed_by = get_latest_user(config)
+    options = {
+        'out': args.out, 'printed_by': printed_by, 'tags': tags,
+        'interval': args.interval, 'aggregation': args.aggregation,
+        'batch_id': args.batch_id.strip(),
+    }
+    tasks = [(args.report, fmt, start, end, config, options)
+             for start, end in time_slices(args.start, args.end, args.every)
+             for fmt in args.format]
+
+    failed = 0
+    if args.workers > 1 and len(tasks) > 1:
+        # spawned, not forked: a forked worker would inherit the pooled
+        # connection the Printed By / batch lookups left in db_pool
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(tasks)),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = [pool.submit(run_task, task) for task in tasks]
+            results = [_result(f.result) for f in futures]
+    else:
+        results = [_result(lambda task=task: run_task(task)) for task in tasks]
+    for task, (path, rows, error) in zip(tasks, results):
+        report, fmt, start, end = task[:4]
+        label = f"{report} {start:%d/%m/%Y %H:%M} - {end:%d/%m/%Y %H:%M} [{fmt}]"
+        if error is not None:
+            failed += 1
+            print(f"FAILED  {label}: {type(error).__name__}: {error}", file=sys.stderr)
+        elif path is None:
+            print(f"no data {label}")
+        else:
+            print(f"ok      {label}: {rows:,} rows -> {path}")
+    return 1 if failed else 0
+
+
+def _result(get):
+    try:
+        path, rows = get()
+        return path, rows, None
+    except Exception as e:
+        return None, 0, e
+
+
+if __name__ == '__main__':
+    sys.exit(main())
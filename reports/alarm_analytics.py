@@ -0,0 +1,139 @@
+# reports/alarm_analytics.py
+"""
+Alarm analytics: who are the worst actors, and when do alarms come in.
+
+Everything is aggregated in SQL Server on top of the same filter stages as
+the alarm list (alarm_filter.kept_alarms_sql), so a 90-day analysis sends
+back a few hundred rows instead of every event:
+
+    top_alarms      top N MessageText by count, first/last seen and the
+                    mean time between occurrences ((last - first) / (n - 1))
+    alarm_frequency alarms per hour of day, per shift or per day (IST)
+
+Shifts are set per db_config.json "Alarms" entry (start times in IST, each
+shift runs until the next one starts):
+
+    "shifts": [{"name": "A", "start": "06:00"}, {"name": "B", "start": "14:00"},
+               {"name": "C", "start": "22:00"}]
+"""
+from datetime import timedelta
+
+import pandas as pd
+
+from .alarm_filter import alarm_filter_settings, kept_alarms_sql
+from .db_pool import pooled_connection
+from .fetch import read_frame
+
+IST_OFFSET_MINUTES = 330   # EventTimeStamp is UTC, the plant runs on IST
+
+DEFAULT_SHIFTS = [
+    {'name': 'A', 'start': '06:00'},
+    {'name': 'B', 'start': '14:00'},
+    {'name': 'C', 'start': '22:00'},
+]
+
+FREQUENCY_GROUPS = ('hour', 'shift', 'day')
+
+_IST = f"DATEADD(MINUTE, {IST_OFFSET_MINUTES}, EventTimeStamp)"
+
+
+def _shift_case(shifts):
+    """CASE expression naming the shift of an IST timestamp."""
+    starts = []
+    for shift in shifts:
+        try:
+            hours, minutes = map(int, str(shift['start']).split(':'))
+        except (KeyError, ValueError):
+            raise ValueError(f"Shift {shift!r} needs a start time as HH:MM")
+        starts.append((hours * 60 + minutes, str(shift['name'])))
+    if not starts:
+        raise ValueError("At least one shift is needed")
+    starts.sort()
+    minute_of_day = f"(DATEPART(HOUR, {_IST}) * 60 + DATEPART(MINUTE, {_IST}))"
+    # latest start first; before the first start it is still the last shift
+    whens = "\n".join(f"            WHEN {minute_of_day} >= {start} THEN ?"
+                      for start, _ in reversed(starts))
+    params = [name for _, name in reversed(starts)] + [starts[-1][1]]
+    return f"CASE\n{whens}\n            ELSE ?\n          END", params
+
+
+def build_top_alarms_query(settings, start_dt_utc, end_dt_utc, top_n=20):
+    kept, params = kept_alarms_sql(settings, start_dt_utc, end_dt_utc)
+    sql = kept + """
+    SELECT TOP (?)
+      MessageText AS Alarm,
+      COUNT(*) AS Occurrences,
+      MIN(EventTimeStamp) AS FirstUTC,
+      MAX(EventTimeStamp) AS LastUTC,
+      CASE WHEN COUNT(*) > 1
+           THEN DATEDIFF(SECOND, MIN(EventTimeStamp), MAX(EventTimeStamp)) * 1.0 / (COUNT(*) - 1)
+      END AS MeanSecondsBetween
+    FROM Kept
+    GROUP BY MessageText
+    ORDER BY COUNT(*) DESC, MessageText;
+    """
+    return sql, params + [int(top_n)]
+
+
+def build_frequency_query(settings, start_dt_utc, end_dt_utc, group='hour', shifts=None):
+    if group not in FREQUENCY_GROUPS:
+        raise ValueError(f"Unknown alarm frequency grouping '{group}'")
+    kept, params = kept_alarms_sql(settings, start_dt_utc, end_dt_utc)
+    extra = []
+    if group == 'hour':
+        key = f"DATEPART(HOUR, {_IST})"
+    elif group == 'day':
+        key = f"CAST({_IST} AS date)"
+    else:
+        key, extra = _shift_case(shifts or DEFAULT_SHIFTS)
+    sql = kept + f"""
+    SELECT Period, COUNT(*) AS Alarms
+    FROM (
+      SELECT {key} AS Period
+      FROM Kept
+    ) AS p
+    GROUP BY Period
+    ORDER BY Period;
+    """
+    return sql, params + extra
+
+
+def top_alarms(start_dt_utc, end_dt_utc, config, top_n=20):
+    """DataFrame [Alarm, Occurrences, First Seen, Last Seen, Mean Time Between]."""
+    settings = alarm_filter_settings(config)
+    sql, params = build_top_alarms_query(settings, start_dt_utc, end_dt_utc, top_n)
+    with pooled_connection(config, "Alarms") as conn:
+        df = read_frame(conn, sql, params)
+    offset = timedelta(minutes=IST_OFFSET_MINUTES)
+    return pd.DataFrame({
+        'Alarm': df['Alarm'],
+        'Occurrences': df['Occurrences'],
+        'First Seen': (pd.to_datetime(df['FirstUTC']) + offset).dt.strftime('%d-%m-%Y %H:%M:%S'),
+        'Last Seen': (pd.to_datetime(df['LastUTC']) + offset).dt.strftime('%d-%m-%Y %H:%M:%S'),
+        'Mean Time Between': _duration_text(df['MeanSecondsBetween']),
+    })
+
+
+def _duration_text(seconds):
+    """Seconds -> "3d 04:05:06" / "04:05:06", "-" for alarms seen only once."""
+    total = pd.to_numeric(seconds, errors='coerce').round()
+    days, rest = total // 86400, total % 86400
+    text = ((rest // 3600).astype('Int64').astype(str).str.zfill(2) + ':'
+            + (rest % 3600 // 60).astype('Int64').astype(str).str.zfill(2) + ':'
+            + (rest % 60).astype('Int64').astype(str).str.zfill(2))
+    text = text.where(days == 0, days.astype('Int64').astype(str) + 'd ' + text)
+    return text.where(total.notna(), '-')
+
+
+def alarm_frequency(start_dt_utc, end_dt_utc, config, group='hour'):
+    """DataFrame [Period, Alarms] - alarms per hour of day, shift or day (IST)."""
+    settings = alarm_filter_settings(config)
+    shifts = config.get('Alarms', {}).get('shifts')
+    sql, params = build_frequency_query(settings, start_dt_utc, end_dt_utc, group, shifts)
+    with pooled_connection(config, "Alarms") as conn:
+        df = read_frame(conn, sql, params)
+    if group == 'hour':
+        df['Period'] = df['Period'].astype(int).astype(str).str.zfill(2) + ':00'
+    elif group == 'day':
+        df['Period'] = pd.to_datetime(df['Period']).dt.strftime('%d-%m-%Y')
+    return df
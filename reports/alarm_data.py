@@ -0,0 +1,72 @@
+# reports/alarm_data.py
+"""
+Alarm Report data access, without Streamlit: the filtered alarms of a
+range as [Date, Time, Alarm] (IST), whole or a cursor batch at a time,
+and how many alarms each filter stage removed (see alarm_filter.py).
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .db_pool import pooled_connection
+from .result_cache import cached_fetch
+from .fetch import read_frame, batch_size_for
+from .alarm_filter import alarm_filter_settings, build_alarm_query, read_alarm_stats
+from .pdf_stream import iter_query_chunks, DEFAULT_CHUNK_SIZE
+
+
+# @st.cache_data(ttl=3600)
+def get_alarm_data(start_dt_utc, end_dt_utc, config):
+    """
+    Fetch alarms between UTC start_dt and end_dt, after the exclusion,
+    de-duplication and chatter stages of alarm_filter (all done in SQL).
+    Returns a DataFrame with columns [Date, Time, Alarm].
+    """
+    settings = alarm_filter_settings(config)
+
+    def fetch(range_start, range_end):
+        query, params = build_alarm_query(settings, range_start, range_end)
+        with pooled_connection(config, "Alarms") as conn:
+            return read_frame(conn, query, params, batch_size_for(config, "Alarms"))
+
+    # EventTimeStamp is UTC, so partitions are closed against UTC now
+    df = cached_fetch(config, "Alarms", "alarm", ("View_1", repr(sorted(settings.items()))),
+                      start_dt_utc, end_dt_utc, fetch, "UTC_Time", clock=datetime.utcnow)
+
+    if df.empty:
+        return df
+    return _format_alarms(df)
+
+
+def get_alarm_filter_stats(start_dt_utc, end_dt_utc, config):
+    """
+    {stage: rows} - how many alarms of the range each filter stage removed.
+    One aggregate over the whole range, not cached (the de-duplication and
+    chatter stages look across partition edges), so it is only run on request.
+    """
+    settings = alarm_filter_settings(config)
+    with pooled_connection(config, "Alarms") as conn:
+        return read_alarm_stats(conn, settings, start_dt_utc, end_dt_utc)
+
+
+def iter_alarm_data(start_dt_utc, end_dt_utc, config, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Same rows as get_alarm_data, as a stream of [Date, Time, Alarm] frames
+    read from the cursor chunk_size rows at a time.
+    """
+    query, params = build_alarm_query(alarm_filter_settings(config), start_dt_utc, end_dt_utc)
+    chunks = iter_query_chunks(config, "Alarms", query, params, chunk_size)
+    return (_format_alarms(c) for c in chunks)
+
+
+def _format_alarms(df):
+    # Convert to proper datetime types
+    df['UTC_Time'] = pd.to_datetime(df['UTC_Time'])
+    
+    # Convert UTC to IST (+5:30)
+    df['IST_Time'] = df['UTC_Time'] + timedelta(hours=5, minutes=30)
+    
+    # Format for display
+    df['Date'] = df['IST_Time'].dt.strftime('%d-%m-%Y')
+    df['Time'] = df['IST_Time'].dt.strftime('%H:%M:%S')
+    return df[['Date', 'Time', 'Alarm']]
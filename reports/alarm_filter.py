@@ -0,0 +1,169 @@
+# reports/alarm_filter.py
+"""
+Alarm filter pipeline, run in SQL Server before rows are sent back.
+
+Every alarm in the window goes through three stages, in order:
+
+    excluded   MessageText is in "exclude" or matches an "exclude_like"
+               pattern (the old hard-coded "Alarm fault" messages by default)
+    duplicate  same MessageText again within the same second ("dedupe")
+    chatter    same MessageText less than "chatter_seconds" after its
+               previous occurrence, so a flapping alarm shows once per burst
+               (0 turns it off)
+
+and whatever is left is "kept". The stages are computed as one CTE body
+(Staged); the report query selects the kept rows from it and the stats
+query counts rows per stage, so the UI can say what each stage removed.
+
+Set per db_config.json "Alarms" entry:
+
+    "filter": {"exclude": [...], "exclude_like": ["%quality is%"],
+               "dedupe": true, "chatter_seconds": 30}
+"""
+from datetime import timedelta
+
+DEFAULT_ALARM_FILTER = {
+    'exclude': [
+        'Alarm fault: Alarm input quality is bad',
+        'Alarm fault cleared: Alarm input quality is good',
+    ],
+    'exclude_like': [],
+    'dedupe': True,
+    'chatter_seconds': 0,
+}
+
+STAGES = ('excluded', 'duplicate', 'chatter', 'kept')
+
+# whole seconds, for de-duplication (DATEDIFF counts boundaries, so this truncates)
+_SECOND = "DATEADD(SECOND, DATEDIFF(SECOND, '20000101', EventTimeStamp), '20000101')"
+
+
+def alarm_filter_settings(config):
+    settings = dict(DEFAULT_ALARM_FILTER, **config.get('Alarms', {}).get('filter', {}))
+    for key in ('exclude', 'exclude_like'):
+        if not isinstance(settings[key], list):
+            raise ValueError(f"Alarm filter '{key}' must be a list of strings")
+    if int(settings['chatter_seconds']) < 0:
+        raise ValueError("Alarm filter 'chatter_seconds' can't be negative")
+    return settings
+
+
+def _staged_sql(settings):
+    """(CTE body, params before the window) for the filter stages."""
+    conditions = []
+    params = []
+    if settings['exclude']:
+        conditions.append(
+            f"MessageText IN ({', '.join('?' for _ in settings['exclude'])})")
+        params.extend(settings['exclude'])
+    for pattern in settings['exclude_like']:
+        conditions.append("MessageText LIKE ?")
+        params.append(pattern)
+    excluded = " OR ".join(conditions) or "1 = 0"
+
+    if settings['dedupe']:
+        rank = f"""ROW_NUMBER() OVER (
+            PARTITION BY Excluded, MessageText, {_SECOND}
+            ORDER BY EventTimeStamp)"""
+    else:
+        rank = "1"
+
+    chatter_seconds = int(settings['chatter_seconds'])
+    if chatter_seconds:
+        # previous not-excluded, not-duplicate occurrence of the same alarm
+        previous = """LAG(EventTimeStamp) OVER (
+            PARTITION BY CASE WHEN Excluded = 0 AND Rn = 1 THEN 1 ELSE 0 END, MessageText
+            ORDER BY EventTimeStamp)"""
+        is_chatter = f"PrevTimeStamp > DATEADD(SECOND, -{chatter_seconds}, EventTimeStamp)"
+    else:
+        previous = "CAST(NULL AS datetime)"
+        is_chatter = "1 = 0"
+
+    staged = f"""
+    WITH
+      Windowed AS (
+        SELECT
+          EventTimeStamp,
+          MessageText,
+          CASE WHEN {excluded} THEN 1 ELSE 0 END AS Excluded
+        FROM View_1
+        WHERE EventTimeStamp BETWEEN ? AND ?
+      ),
+      Ranked AS (
+        SELECT *, {rank} AS Rn
+        FROM Windowed
+      ),
+      Chained AS (
+        SELECT *, {previous} AS PrevTimeStamp
+        FROM Ranked
+      ),
+      Staged AS (
+        SELECT
+          EventTimeStamp,
+          MessageText,
+          CASE
+            WHEN Excluded = 1 THEN 'excluded'
+            WHEN Rn > 1 THEN 'duplicate'
+            WHEN {is_chatter} THEN 'chatter'
+            ELSE 'kept'
+          END AS Stage
+        FROM Chained
+      )"""
+    return staged, params
+
+
+def _window_params(settings, start_dt_utc, end_dt_utc):
+    # look back one chatter window, so the first alarms of the range are
+    # judged against what came just before it (and cached partitions agree)
+    lookback = timedelta(seconds=int(settings['chatter_seconds']))
+    return [start_dt_utc - lookback, end_dt_utc]
+
+
+def kept_alarms_sql(settings, start_dt_utc, end_dt_utc):
+    """
+    (CTE body ending in "Kept (EventTimeStamp, MessageText)", params) - the
+    alarms of the range that passed every stage, for queries built on top.
+    """
+    staged, params = _staged_sql(settings)
+    sql = staged + """,
+      Kept AS (
+        SELECT EventTimeStamp, MessageText
+        FROM Staged
+        WHERE Stage = 'kept'
+          AND EventTimeStamp >= ?
+      )"""
+    return sql, params + _window_params(settings, start_dt_utc, end_dt_utc) + [start_dt_utc]
+
+
+def build_alarm_query(settings, start_dt_utc, end_dt_utc):
+    """(sql, params) for the kept alarms [UTC_Time, Alarm] in time order."""
+    kept, params = kept_alarms_sql(settings, start_dt_utc, end_dt_utc)
+    sql = kept + """
+    SELECT
+      EventTimeStamp AS UTC_Time,
+      MessageText AS Alarm
+    FROM Kept
+    ORDER BY EventTimeStamp;
+    """
+    return sql, params
+
+
+def build_alarm_stats_query(settings, start_dt_utc, end_dt_utc):
+    """(sql, params) for [Stage, Total] of the window."""
+    staged, params = _staged_sql(settings)
+    sql = staged + """
+    SELECT Stage, COUNT(*) AS Total
+    FROM Staged
+    WHERE EventTimeStamp >= ?
+    GROUP BY Stage;
+    """
+    return sql, params + _window_params(settings, start_dt_utc, end_dt_utc) + [start_dt_utc]
+
+
+def read_alarm_stats(conn, settings, start_dt_utc, end_dt_utc):
+    """{stage: rows} for every stage in STAGES (0 where nothing matched)."""
+    sql, params = build_alarm_stats_query(settings, start_dt_utc, end_dt_utc)
+    counts = dict.fromkeys(STAGES, 0)
+    for stage, total in conn.cursor().execute(sql, params).fetchall():
+        counts[stage] = int(total)
+    return counts
@@ -0,0 +1,75 @@
+# reports/alarm_pdf.py
+"""
+Alarm Report PDF, without Streamlit: one Date | Time | Alarm table under
+the shared page layout (report_doc.py), built from a DataFrame or streamed
+from chunks for very long ranges.
+"""
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.units import mm
+from reportlab.platypus import Table, TableStyle
+
+from .pdf_stream import FlowableStream, table_flowables, DEFAULT_ROWS_PER_TABLE
+from .report_doc import report_doc, date_range_lines, NumberedCanvas
+
+
+def generate_alarm_pdf_report(df, params):
+    """
+    Build a PDF:
+      • Logo + company header
+      • “Alarm Report” title + FROM/TO
+      • Table with Date | Time | Alarm
+      • Footer with Printed By, Printed Date, “Page X of Y”, Verified By
+    """
+    buffer = BytesIO()
+    story = []
+    if not df.empty:
+        data = [df.columns.tolist()] + df.values.tolist()
+        story.append(_alarm_table(data))
+
+    doc = _alarm_doc(buffer, params)
+    doc.build(story, canvasmaker=NumberedCanvas)
+
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+
+def generate_alarm_pdf_report_streaming(chunks, params, output,
+                                        rows_per_table=DEFAULT_ROWS_PER_TABLE):
+    """
+    Same layout as generate_alarm_pdf_report, for very long ranges.
+    `chunks` is an iterable of [Date, Time, Alarm] frames (see iter_alarm_data);
+    the PDF is written to `output` (a path or binary file object) one
+    rows_per_table table at a time. Returns the number of rows written.
+    """
+    header = ['Date', 'Time', 'Alarm']
+    written = [0]
+
+    def make_table(rows):
+        written[0] += len(rows)
+        return _alarm_table([header] + rows)
+
+    doc = _alarm_doc(output, params)
+    doc.build(FlowableStream(table_flowables(chunks, make_table, rows_per_table)),
+              canvasmaker=NumberedCanvas)
+    return written[0]
+
+
+def _alarm_table(data):
+    # three columns: Date(30mm), Time(20mm), Alarm(flex)
+    tbl = Table(data, repeatRows=1, colWidths=[30*mm, 20*mm, None])
+    tbl.setStyle(TableStyle([
+        ('ALIGN', (0,0),(1,-1), 'CENTER'),
+        ('ALIGN', (2,0),(2,-1), 'LEFT'),
+        ('FONTSIZE', (0,0),(-1,0), 9),
+        ('FONTSIZE', (0,1),(-1,-1), 7),
+        ('BACKGROUND', (0,0),(-1,0), colors.whitesmoke),
+        ('GRID', (0,0),(-1,-1), 0.5, colors.grey),
+    ]))
+    return tbl
+
+
+def _alarm_doc(output, params):
+    return report_doc(output, "Alarm Report", date_range_lines(params), params)
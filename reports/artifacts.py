@@ -0,0 +1,105 @@
+# reports/artifacts.py
+"""
+Finished report files, served by Streamlit's static file route instead of
+being pushed through the websocket as base64 data URIs.
+
+Files go to static/reports/ next to app.py, which Streamlit serves at
+app/static/reports/<name> (enableStaticServing in .streamlit/config.toml).
+Every file gets a random, unguessable name, so the URL works only for
+whoever was given it, and files older than ARTIFACT_TTL_MINUTES are
+deleted on the next save.
+
+    artifact = save_artifact(pdf_bytes)          # bytes already in memory
+    artifact, rows = stream_to_artifact(         # or let a writer fill a file
+        lambda path: write_rows(chunks, path))
+"""
+import os
+import secrets
+import threading
+import time as _time
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_DIR = os.path.join(APP_ROOT, 'static', 'reports')
+ARTIFACT_URL = 'app/static/reports'
+ARTIFACT_TTL_MINUTES = 30
+PARTIAL_SUFFIX = '.part'
+PARTIAL_TTL_MINUTES = 24 * 60
+
+_sweep_lock = threading.Lock()
+
+
+class Artifact:
+    def __init__(self, name):
+        self.name = name
+        self.path = os.path.join(ARTIFACT_DIR, name)
+        self.url = f"{ARTIFACT_URL}/{name}"
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+
+def reserve_artifact(suffix='.pdf'):
+    """A path to write a new artifact to; it isn't served until published."""
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    return os.path.join(ARTIFACT_DIR, secrets.token_urlsafe(24) + suffix + PARTIAL_SUFFIX)
+
+
+def publish_artifact(partial_path):
+    final_path = partial_path[:-len(PARTIAL_SUFFIX)]
+    os.replace(partial_path, final_path)
+    sweep_artifacts()
+    return Artifact(os.path.basename(final_path))
+
+
+def discard_artifact(partial_path):
+    if os.path.exists(partial_path):
+        os.remove(partial_path)
+
+
+def save_artifact(data, suffix='.pdf'):
+    path = reserve_artifact(suffix)
+    try:
+        with open(path, 'wb') as f:
+            f.write(data)
+    except Exception:
+        discard_artifact(path)
+        raise
+    return publish_artifact(path)
+
+
+def stream_to_artifact(write, suffix='.pdf'):
+    """
+    (Artifact, rows) for a file written straight into the store by
+    write(path), which returns the number of rows it wrote. (None, 0) if
+    it wrote none; the partial file is removed then, or if write fails.
+    """
+    path = reserve_artifact(suffix)
+    try:
+        rows = write(path)
+    except Exception:
+        discard_artifact(path)
+        raise
+    if not rows:
+        discard_artifact(path)
+        return None, 0
+    return publish_artifact(path), rows
+
+
+def sweep_artifacts(ttl_minutes=ARTIFACT_TTL_MINUTES):
+    """Delete artifacts (and abandoned partial files) older than the TTL."""
+    if not os.path.isdir(ARTIFACT_DIR):
+        return
+    now = _time.time()
+    with _sweep_lock:
+        for entry in os.scandir(ARTIFACT_DIR):
+            # a partial file may still be written to by a long streaming build
+            ttl = PARTIAL_TTL_MINUTES if entry.name.endswith(PARTIAL_SUFFIX) else ttl_minutes
+            try:
+                if entry.is_file() and entry.stat().st_mtime < now - ttl * 60:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,141 @@
+# reports/audit_data.py
+"""
+Audit Report data access, without Streamlit: AuditReport entries of a
+range without the service accounts (audit_filter.py), as
+[Date, Time, MessageText, UserID] (IST) - whole, a cursor batch at a time,
+or one keyset page at a time for the on-screen preview.
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from .db_pool import pooled_connection
+from .result_cache import cached_fetch
+from .fetch import read_frame, batch_size_for
+from .audit_filter import SERVICE_ACCOUNT_FILTER, service_account_params
+from .pdf_stream import iter_query_chunks, drop_repeated, DEFAULT_CHUNK_SIZE
+
+
+AUDIT_QUERY = f"""
+    WITH AuditCTE AS (
+      SELECT
+        TimeStmp    AS UTC_Time,
+        MessageText,
+        UserID,
+        UserFullName,
+        Audience
+      FROM AuditReport
+      WHERE TimeStmp BETWEEN ? AND ?
+        AND {SERVICE_ACCOUNT_FILTER}
+    )
+    SELECT
+      UTC_Time,
+      MessageText,
+      UserID,
+      UserFullName,
+      Audience
+    FROM AuditCTE
+    ORDER BY UTC_Time;
+    """
+
+# Keyset pages for the on-screen preview: the next page starts right after
+# the last (TimeStmp, id) seen, so page 40 costs the same index seek as page 1
+# (see AuditIndexes.sql) instead of an OFFSET that re-reads everything before it.
+AUDIT_PAGE_SIZE = 500
+
+AUDIT_PAGE_QUERY = f"""
+    SELECT TOP (?)
+      TimeStmp    AS UTC_Time,
+      id          AS RowID,
+      MessageText,
+      UserID
+    FROM AuditReport
+    WHERE TimeStmp BETWEEN ? AND ?{{after}}
+      AND {SERVICE_ACCOUNT_FILTER}
+    ORDER BY TimeStmp, id;
+    """
+
+# TimeStmp is a datetime column: compare against the value as read back,
+# not the datetime2 the driver binds (.003 would become .0033333)
+_AFTER_KEY = """
+      AND (TimeStmp > CAST(? AS datetime)
+           OR (TimeStmp = CAST(? AS datetime) AND id > ?))"""
+
+
+def _audit_params(config, start_dt, end_dt, conn=None):
+    # machine name looked up once per pool, see audit_filter.py
+    return (start_dt, end_dt) + service_account_params(config, conn)
+
+
+def get_audit_data(start_dt, end_dt, config):
+    """
+    Fetch AuditReport entries between start_dt and end_dt,
+    convert timestamp to IST, filter out system/service accounts.
+    """
+    def fetch(range_start, range_end):
+        with pooled_connection(config, "Audit") as conn:
+            # 5) Execute & return a pandas DataFrame
+            params = _audit_params(config, range_start, range_end, conn)
+
+            # Query with UTC times
+            return read_frame(conn, AUDIT_QUERY, params, batch_size_for(config, "Audit"))
+
+    # TimeStmp is UTC, so partitions are closed against UTC now
+    df = cached_fetch(config, "Audit", "audit", "AuditReport", start_dt, end_dt,
+                      fetch, "UTC_Time", clock=datetime.utcnow)
+
+    if df.empty:
+        return df
+
+    # Remove duplicates where Date, Time, and Alarm are identical
+    return _format_audit(df).drop_duplicates(subset=['Date', 'Time', 'MessageText', 'UserID'])
+
+
+def get_audit_page(start_dt_utc, end_dt_utc, config, after=None, page_size=None):
+    """
+    One page of the audit window in (TimeStmp, id) order, for the preview.
+    `after` is the key returned with the previous page (None for the first).
+    Returns ([Date, Time, MessageText, UserID] frame, key of the next page or
+    None on the last page).
+    """
+    page_size = int(page_size or config.get('Audit', {}).get('preview_page_size', AUDIT_PAGE_SIZE))
+    with pooled_connection(config, "Audit") as conn:
+        patterns = service_account_params(config, conn)
+        if after is None:
+            query = AUDIT_PAGE_QUERY.format(after="")
+            params = [page_size, start_dt_utc, end_dt_utc]
+        else:
+            query = AUDIT_PAGE_QUERY.format(after=_AFTER_KEY)
+            params = [page_size, start_dt_utc, end_dt_utc, after[0], after[0], after[1]]
+        df = read_frame(conn, query, params + list(patterns))
+
+    if len(df) < page_size:
+        next_key = None
+    else:
+        last = df.iloc[-1]
+        next_key = (pd.Timestamp(last['UTC_Time']).to_pydatetime(), int(last['RowID']))
+    return _format_audit(df), next_key
+
+
+def iter_audit_data(start_dt, end_dt, config, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Same rows as get_audit_data, as a stream of [Date, Time, MessageText, UserID]
+    frames read from the cursor chunk_size rows at a time.
+    """
+    params = _audit_params(config, start_dt, end_dt)
+    chunks = iter_query_chunks(config, "Audit", AUDIT_QUERY, params, chunk_size)
+    return drop_repeated((_format_audit(c) for c in chunks),
+                         ['Date', 'Time', 'MessageText', 'UserID'], ['Date', 'Time'])
+
+
+def _format_audit(df):
+    # Convert to proper datetime types
+    df['UTC_Time'] = pd.to_datetime(df['UTC_Time'])
+    
+    # Convert UTC to IST (+5:30)
+    df['IST_Time'] = df['UTC_Time'] + timedelta(hours=5, minutes=30)
+    
+    # Format for display
+    df['Date'] = df['IST_Time'].dt.strftime('%d-%m-%Y')
+    df['Time'] = df['IST_Time'].dt.strftime('%H:%M:%S')
+    return df[['Date', 'Time', 'MessageText', 'UserID']]
@@ -0,0 +1,48 @@
+# reports/audit_filter.py
+"""
+Which AuditReport users are service accounts, not people.
+
+Both the Audit Report and get_latest_user ("Printed By") leave out the
+built-in service accounts plus the two accounts named after the SQL Server
+machine:
+
+    DOMAIN\\MachineName$    the computer account
+    MachineName\\ADMIN      the local admin
+
+The SQL text is a constant, so SQL Server reuses one cached plan; only the
+two LIKE patterns are parameters. The machine name is looked up once per
+connection pool (see db_pool.pool_metadata) instead of on every query.
+
+    where, params = SERVICE_ACCOUNT_FILTER, service_account_params(config)
+"""
+from .db_pool import pool_metadata
+
+SERVICE_ACCOUNTS = (
+    'NT AUTHORITY\\NETWORK SERVICE',
+    'N/A',
+    'FactoryTalk Service',
+    'NT AUTHORITY\\LOCAL SERVICE',
+    'NT AUTHORITY\\SYSTEM',
+)
+
+SERVICE_ACCOUNT_FILTER = (
+    "UserID NOT IN ("
+    + ", ".join("'" + account.replace("'", "''") + "'" for account in SERVICE_ACCOUNTS)
+    + ")"
+    # exclude the computer account (DOMAIN\MachineName$)
+    + " AND UserID NOT LIKE ?"
+    # exclude the local admin account (MachineName\ADMIN)
+    + " AND UserID NOT LIKE ?"
+)
+
+
+def _machine_name(conn):
+    return conn.execute(
+        "SELECT CAST(SERVERPROPERTY('MachineName') AS sysname)"
+    ).fetchval()
+
+
+def service_account_params(config, conn=None):
+    """The two LIKE patterns of SERVICE_ACCOUNT_FILTER for the Audit server."""
+    server_name = pool_metadata(config, "Audit", 'machine_name', _machine_name, conn)
+    return (f"%\\{server_name}$", f"{server_name}\\ADMIN")
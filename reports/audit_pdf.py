@@ -0,0 +1,129 @@
+# reports/audit_pdf.py
+"""
+Audit Report PDF, without Streamlit: one Date | Time | MessageText | UserID
+table under the shared page layout (report_doc.py), the message column
+wrapped, built from a DataFrame or streamed from chunks for long ranges.
+"""
+from io import BytesIO
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, Table, TableStyle
+
+from .pdf_stream import FlowableStream, table_flowables, DEFAULT_ROWS_PER_TABLE
+from .report_doc import report_doc, date_range_lines, NumberedCanvas
+from .text_width import column_text_width
+
+# Margins and page setup
+PAGE_SIZE = A4
+LEFT, RIGHT = 10*mm, 10*mm
+TOP, BOTTOM = 50*mm, 20*mm
+
+# Define which column should expand (e.g., index 2 = third column)
+EXPAND_COL_INDEX = 2  # Change this as needed (e.g., Description/UserID)
+
+
+def generate_audit_pdf_report(df, params):
+    buffer = BytesIO()
+
+    # Prepare story
+    story = []
+
+    if not df.empty:
+        style_normal = _cell_style()
+
+        # Convert DataFrame to list of lists with Paragraphs for wrapping
+        col_widths = _audit_col_widths(df)
+        data = [df.columns.tolist()] + _wrap_rows(df.astype(str).values.tolist(), style_normal)
+
+        story.append(_audit_table(data, col_widths))
+
+    doc = _audit_doc(buffer, params)
+    doc.build(story, canvasmaker=NumberedCanvas)
+
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
+
+
+def generate_audit_pdf_report_streaming(chunks, params, output,
+                                        rows_per_table=DEFAULT_ROWS_PER_TABLE):
+    """
+    Same layout as generate_audit_pdf_report, for very long ranges.
+    `chunks` is an iterable of [Date, Time, MessageText, UserID] frames (see
+    iter_audit_data); the PDF is written to `output` (a path or binary file
+    object) one rows_per_table table at a time. Column widths are measured
+    on the first chunk. Returns the number of rows written.
+    """
+    header = ['Date', 'Time', 'MessageText', 'UserID']
+    style_normal = _cell_style()
+    state = {'rows': 0, 'col_widths': None}
+
+    def measured(chunks):
+        for chunk in chunks:
+            if state['col_widths'] is None:
+                state['col_widths'] = _audit_col_widths(chunk)
+            yield chunk
+
+    def make_table(rows):
+        state['rows'] += len(rows)
+        return _audit_table([header] + _wrap_rows(rows, style_normal), state['col_widths'])
+
+    doc = _audit_doc(output, params)
+    doc.build(FlowableStream(table_flowables(measured(chunks), make_table, rows_per_table)),
+              canvasmaker=NumberedCanvas)
+    return state['rows']
+
+
+def _audit_col_widths(df):
+    # Estimate max width per column (distinct values only, see text_width);
+    # the expanding column gets whatever is left, so it isn't measured
+    col_widths = []
+    for i, col in enumerate(df.columns):
+        if i == EXPAND_COL_INDEX:
+            col_widths.append(0)
+            continue
+        max_text_width = column_text_width(df[col], 'Helvetica', 7)
+        col_widths.append(max(max_text_width + 10, 20*mm))
+
+    # Adjust expanding column to take up remaining space
+    fixed_width_sum = sum(col_widths[:EXPAND_COL_INDEX] + col_widths[EXPAND_COL_INDEX+1:])
+    col_widths[EXPAND_COL_INDEX] = max(30*mm, PAGE_SIZE[0] - LEFT - RIGHT - fixed_width_sum)
+    return col_widths
+
+
+def _wrap_rows(rows, style_normal):
+    """Row lists of strings -> the same rows with the expanding column wrapped in Paragraphs."""
+    for row in rows:
+        row[EXPAND_COL_INDEX] = Paragraph(row[EXPAND_COL_INDEX], style_normal)
+    return rows
+
+
+def _cell_style():
+    styles = getSampleStyleSheet()
+    style_normal = styles['Normal']
+    style_normal.fontSize = 7
+    style_normal.leading = 8
+    return style_normal
+
+
+def _audit_table(data, col_widths):
+    tbl = Table(data, repeatRows=1, colWidths=col_widths)
+    tbl.setStyle(TableStyle([
+        ('ALIGN', (0,0),(1,-1), 'CENTER'),
+        ('ALIGN', (2,0),(2,-1), 'LEFT'),
+        ('ALIGN', (3,0),(3,-1), 'CENTER'),
+        ('FONTSIZE', (0,0),(-1,0), 9),
+        ('FONTSIZE', (0,1),(-1,-1), 7),
+        ('BACKGROUND', (0,0),(-1,0), colors.whitesmoke),
+        ('TEXTCOLOR', (0,0),(-1,-1), colors.black),
+        ('GRID', (0,0),(-1,-1), 0.5, colors.grey),
+        ('VALIGN', (0,0), (-1,-1), 'TOP'),
+    ]))
+    return tbl
+
+
+def _audit_doc(output, params):
+    return report_doc(output, "Audit Report", date_range_lines(params), params)
@@ -2,100 +2,15 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime, time, timedelta
-from io import BytesIO
 
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-from reportlab.platypus import (
-    BaseDocTemplate, Frame, PageTemplate,
-    Table, TableStyle, PageBreak, Image
-)
-
-from io import BytesIO
-from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.pdfgen import canvas
-# reuse your connection, user-lookup, and canvas-numbering from process_report
-from .process_report import get_db_connection, get_latest_user, NumberedCanvas
-import base64
-from streamlit.components.v1 import html
-
-
-def get_audit_data(start_dt, end_dt, config):
-    """
-    Fetch AuditReport entries between start_dt and end_dt,
-    convert timestamp to IST, filter out system/service accounts.
-    """
-    conn = get_db_connection(config, db_name="Audit")
-    server_name = conn.execute(
-        "SELECT CAST(SERVERPROPERTY('MachineName') AS sysname)"
-    ).fetchval()
-    # print(f"Connected to server: {server_name}")
-    # print(f"%\\{server_name}$")
-    # print(f"{server_name}\\ADMIN")
-
-    query = r"""
-    WITH AuditCTE AS (
-      SELECT
-        TimeStmp    AS UTC_Time,
-        MessageText,
-        UserID,
-        UserFullName,
-        Audience
-      FROM AuditReport
-      WHERE TimeStmp BETWEEN ? AND ?
-        AND UserID NOT IN (
-          'NT AUTHORITY\NETWORK SERVICE',
-          'N/A',
-          'FactoryTalk Service',
-          'NT AUTHORITY\LOCAL SERVICE',
-          'NT AUTHORITY\SYSTEM'
-        )
-        -- exclude the computer account (DOMAIN\MachineName$)
-        AND UserID NOT LIKE ?
-        -- exclude the local admin account (MachineName\ADMIN)
-        AND UserID NOT LIKE ?
-    )
-    SELECT
-      UTC_Time,
-      MessageText,
-      UserID,
-      UserFullName,
-      Audience
-    FROM AuditCTE
-    ORDER BY UTC_Time;
-    """
-    
-    # 4) Build the two patterns for the LIKE filters
-    pattern_computer = f"%\\{server_name}$"
-    pattern_admin    = f"{server_name}\\ADMIN"
-    # 5) Execute & return a pandas DataFrame
-    params = (start_dt, end_dt, pattern_computer, pattern_admin)
-
-    # Query with UTC times
-    df = pd.read_sql_query(query, conn, params=params)
-
-    if df.empty:
-        return df
-
-    # Convert to proper datetime types
-    df['UTC_Time'] = pd.to_datetime(df['UTC_Time'])
-    
-    # Convert UTC to IST (+5:30)
-    df['IST_Time'] = df['UTC_Time'] + timedelta(hours=5, minutes=30)
-    
-    # Format for display
-    df['Date'] = df['IST_Time'].dt.strftime('%d-%m-%Y')
-    df['Time'] = df['IST_Time'].dt.strftime('%H:%M:%S')
-
-    # Remove duplicates where Date, Time, and Alarm are identical
-    df = df.drop_duplicates(subset=['Date', 'Time', 'MessageText', 'UserID'])
-    return df[['Date', 'Time', 'MessageText', 'UserID']]
+from .latest_user import get_latest_user
+from .audit_data import get_audit_data, get_audit_page, iter_audit_data
+from .job_view import start_report_job, show_report_job, preview_pdf, export_controls
+from .export import export_artifact
+from .artifacts import save_artifact, stream_to_artifact
+from .pdf_stream import counted_chunks, STREAMING_MIN_DAYS
 
+PREVIEW_KEY = 'audit_preview'   # st.session_state: pages loaded so far
 
 
 # def get_audit_data(start_dt, end_dt, config):
@@ -151,152 +66,6 @@ def get_audit_data(start_dt, end_dt, config):
 
 
 
-# Assume these are defined somewhere
-# from your_project.utils import NumberedCanvas
-
-def generate_audit_pdf_report(df, params):
-    buffer = BytesIO()
-
-    # Margins and page setup
-    PAGE_SIZE = A4
-    LEFT, RIGHT = 10*mm, 10*mm
-    TOP, BOTTOM = 50*mm, 20*mm
-
-    class MyDoc(BaseDocTemplate):
-        def __init__(self, fn, **kw):
-            super().__init__(fn, pagesize=PAGE_SIZE, **kw)
-            frame_h = self.pagesize[1] - TOP - BOTTOM
-            frame = Frame(LEFT, BOTTOM,
-                          self.pagesize[0] - LEFT - RIGHT,
-                          frame_h, id='normal')
-            tpl = PageTemplate(id='all',
-                               frames=[frame],
-                               onPage=self.header_footer)
-            self.addPageTemplates([tpl])
-
-        def header_footer(self, canvas, doc):
-            self._draw_header(canvas, doc)
-            self._draw_footer(canvas, doc)
-
-        def _draw_header(self, canvas, doc):
-            canvas.saveState()
-            try:
-                logo = Image('alivus_logo.png', width=60, height=60)
-                logo.drawOn(canvas, 15*mm, doc.pagesize[1] - 25*mm)
-            except:
-                pass
-
-            canvas.setFont('Helvetica-Bold', 16)
-            canvas.drawCentredString(
-                doc.pagesize[0]/2,
-                doc.pagesize[1] - 20*mm,
-                "ALIVUS LIFE SCIENCES LIMITED ANKLESHWAR"
-            )
-
-            canvas.setFont('Helvetica-Bold', 14)
-            canvas.drawCentredString(
-                doc.pagesize[0]/2,
-                doc.pagesize[1] - 32*mm,
-                "Audit Report"
-            )
-
-            if params:
-                canvas.setFont('Helvetica', 9)
-                y0 = doc.pagesize[1] - 40*mm
-                canvas.drawString(120*mm, y0, f"FROM DATE: {params.get('FROM DATE','')}")
-                canvas.drawString(120*mm, y0 - 5*mm, f"TO DATE:   {params.get('TO DATE','')}")
-
-            canvas.restoreState()
-
-        def _draw_footer(self, canvas, doc):
-            canvas.saveState()
-            canvas.setFont('Helvetica', 8)
-            canvas.setFillColor(colors.black)
-            
-            # Printed By
-            printedBy = params.get('Printed By', '[no user logged in]') 
-            canvas.drawString(10 * mm, 10 * mm, f"Printed By: {printedBy}")
-
-            # Printed Date (centered)
-            printed_date = datetime.now().strftime('%d/%m/%Y %H:%M')
-            date_text_width = canvas.stringWidth(printed_date, 'Helvetica', 8)
-            center_x = (doc.pagesize[0] / 2) - (date_text_width / 2) - 10 * mm
-            canvas.drawString(center_x, 10 * mm, f"Printed Date: {printed_date}")
-            
-            # Page Number (right side)
-            page_num = canvas.getPageNumber()
-            # canvas.drawRightString(150 * mm, 10 * mm, f"Page {page_num}")
-            
-            # Verified By line
-            canvas.drawString(170 * mm, 10 * mm, "Verified By: ")
-            canvas.restoreState()
-
-    # Prepare story
-    story = []
-
-    if not df.empty:
-        styles = getSampleStyleSheet()
-        style_normal = styles['Normal']
-        style_normal.fontSize = 7
-        style_normal.leading = 8
-
-        # Convert DataFrame to list of lists with Paragraphs for wrapping
-        data = [df.columns.tolist()]
-        col_count = len(df.columns)
-
-        # Define which column should expand (e.g., index 2 = third column)
-        EXPAND_COL_INDEX = 2  # Change this as needed (e.g., Description/UserID)
-
-        # Estimate max width per column
-        col_widths = []
-        max_col_widths = [120*mm] * col_count  # Max possible width for each column
-
-        for idx, col in enumerate(df.columns):
-            max_text_width = max(
-                canvas.Canvas('').stringWidth(str(val), 'Helvetica', 7)
-                for val in df[col].astype(str).tolist()
-            )
-            col_widths.append(max(max_text_width + 10, 20*mm))
-
-        # Adjust expanding column to take up remaining space
-        fixed_width_sum = sum(col_widths[:EXPAND_COL_INDEX] + col_widths[EXPAND_COL_INDEX+1:])
-        expand_col_width = max(30*mm, PAGE_SIZE[0] - LEFT - RIGHT - fixed_width_sum)
-        col_widths[EXPAND_COL_INDEX] = expand_col_width
-
-        # Wrap text in each cell using Paragraph
-        for _, row in df.iterrows():
-            wrapped_row = []
-            for i, val in enumerate(row):
-                if i == EXPAND_COL_INDEX:
-                    wrapped_row.append(Paragraph(str(val), style_normal))
-                else:
-                    wrapped_row.append(str(val))
-            data.append(wrapped_row)
-
-        tbl = Table(data, repeatRows=1, colWidths=col_widths)
-        tbl.setStyle(TableStyle([
-            ('ALIGN', (0,0),(1,-1), 'CENTER'),
-            ('ALIGN', (2,0),(2,-1), 'LEFT'),
-            ('ALIGN', (3,0),(3,-1), 'CENTER'),
-            ('FONTSIZE', (0,0),(-1,0), 9),
-            ('FONTSIZE', (0,1),(-1,-1), 7),
-            ('BACKGROUND', (0,0),(-1,0), colors.whitesmoke),
-            ('TEXTCOLOR', (0,0),(-1,-1), colors.black),
-            ('GRID', (0,0),(-1,-1), 0.5, colors.grey),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-        ]))
-        story.append(tbl)
-
-    doc = MyDoc(buffer,
-                leftMargin=LEFT, rightMargin=RIGHT,
-                topMargin=TOP, bottomMargin=BOTTOM)
-    doc.build(story, canvasmaker=NumberedCanvas)
-
-    pdf = buffer.getvalue()
-    buffer.close()
-    return pdf
-
-
 def show(databases):
     st.subheader("📘 Audit Report")
 
@@ -328,92 +97,80 @@ def show(databases):
     # interval = st.number_input("Time Interval (minutes)", min_value=1, value=10)
     
     if st.button("Generate Report"):
-        with st.spinner("Fetching data from database..."):
-            df = get_audit_data(start_dt_utc, end_dt_utc, databases)
-        if df.empty:
-            st.warning("No audit records found for that period.")
-            return
-
-        # st.dataframe(df, use_container_width=True)
         params = {
             "FROM DATE": start_dt.strftime('%d/%m/%Y %H:%M'),
             "TO DATE":   end_dt.strftime('%d/%m/%Y %H:%M'),
-            "Printed By": get_latest_user(databases)
-        }
-        pdf = generate_audit_pdf_report(df, params)
-
-        # st.download_button(
-        #     label="📥 Print Report",
-        #     data=pdf,
-        #     file_name=f"Audit_Report_{datetime.now():%Y%m%d_%H%M}.pdf",
-        #     mime="application/pdf"
-        # )
-
-        # Encode the PDF to base64 so it can be rendered in HTML
-        pdf_b64 = base64.b64encode(pdf).decode()
-
-        # Inject HTML + JS to display and auto-print the PDF
-        st.markdown(f"""
-            <style>
-                .pdf-container {{
-                    width: 100%;
-                    height: 80vh;
-                    border: none;
-                }}
-            </style>
-            <h4>📄 Previewing Report </h4>
-            <iframe class="pdf-container" 
-                    src="data:application/pdf;base64,{pdf_b64}" 
-                    type="application/pdf"
-                    onload="this.contentWindow.print();">
-            </iframe>
-        """, unsafe_allow_html=True)
-
-        if df.empty:
-            st.warning("No audit records found for that period.")
-            return
-
-        # --- Style the DataFrame as HTML table with fixed column widths ---
-        styled_html = df.to_html(index=False, classes='styled-table', escape=False)
-
-        # Custom CSS to style the table
-        st.markdown("""
-        <style>
-        .styled-table {
-            width: 100%;
-            border-collapse: collapse;
-            font-family: Arial, sans-serif;
-            background-color: white;
-            margin-bottom: 20px;
-        }
-
-        .styled-table th, .styled-table td {
-            border: 1px solid #ddd;
-            padding: 8px;
-            vertical-align: top;
-        }
-
-        .styled-table th {
-            background-color: #f2f2f2;
-            text-align: center;
-            font-weight: bold;
+            "Printed By": get_latest_user(databases, on_warning=st.warning)
         }
+        # long range: rows go from the cursor straight into the PDF
+        streaming = end_dt - start_dt > timedelta(days=STREAMING_MIN_DAYS)
+        # built in the background, so reruns don't throw the work away
+        start_report_job("audit", _audit_job, start_dt_utc, end_dt_utc, databases,
+                         params, streaming, label=f"Audit Report {params['FROM DATE']} - {params['TO DATE']}")
+        # first page on screen right away, while the PDF is being built
+        st.session_state[PREVIEW_KEY] = {'range': (start_dt_utc, end_dt_utc),
+                                         'pages': [], 'after': None, 'more': True}
+        _load_audit_page(databases)
+
+    _audit_preview(databases)
+    show_report_job("audit", _show_audit_result)
+
+    export_controls("audit", _audit_export_job, start_dt_utc, end_dt_utc, databases,
+                    label=f"Audit Export {start_dt:%d/%m/%Y %H:%M} - {end_dt:%d/%m/%Y %H:%M}")
+
+
+def _load_audit_page(config):
+    preview = st.session_state[PREVIEW_KEY]
+    page, preview['after'] = get_audit_page(*preview['range'], config, after=preview['after'])
+    preview['more'] = preview['after'] is not None
+    if not page.empty:
+        preview['pages'].append(page)
+
+
+@st.fragment
+def _audit_preview(config):
+    """Records loaded so far; "Load more" fetches the next page (reruns this part only)."""
+    preview = st.session_state.get(PREVIEW_KEY)
+    if not preview or not preview['pages']:
+        return
+    df = pd.concat(preview['pages'], ignore_index=True).drop_duplicates(
+        subset=['Date', 'Time', 'MessageText', 'UserID'])
+    more = "" if not preview['more'] else " (more available)"
+    st.caption(f"{len(df):,} records loaded{more}")
+    st.dataframe(df, hide_index=True, height=400)
+    if preview['more']:
+        st.button("Load more", key="audit_load_more", on_click=_load_audit_page, args=(config,))
+
+
+def _audit_job(job, start_dt_utc, end_dt_utc, config, params, streaming):
+    """Runs on the report job pool. The PDF as an Artifact, or None if there were no records."""
+    if streaming:
+        job.update(0.05, "Building report from database...")
+        from .audit_pdf import generate_audit_pdf_report_streaming
+        chunks = counted_chunks(iter_audit_data(start_dt_utc, end_dt_utc, config),
+                                lambda n: job.update(message=f"{n:,} records written to the PDF..."))
+        artifact, _ = stream_to_artifact(
+            lambda path: generate_audit_pdf_report_streaming(chunks, params, path))
+        return artifact
+
+    job.update(0.1, "Fetching data from database...")
+    df = get_audit_data(start_dt_utc, end_dt_utc, config)
+    if df.empty:
+        return None
+    job.update(0.5, f"Building PDF ({len(df):,} records)...")
+    from .audit_pdf import generate_audit_pdf_report
+    return save_artifact(generate_audit_pdf_report(df, params))
 
-        .styled-table td:nth-child(1), 
-        .styled-table td:nth-child(2) {
-            white-space: nowrap;
-            width: 120px; /* Date */
-        }
 
-        .styled-table td:nth-child(3), 
-        .styled-table td:nth-child(4) {
-            white-space: normal;
-            word-wrap: break-word;
-            max-width: 400px;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+def _audit_export_job(job, start_dt_utc, end_dt_utc, config, fmt):
+    """Runs on the report job pool. Records straight from the cursor into the file."""
+    job.update(0.05, "Exporting audit records...")
+    return export_artifact(iter_audit_data(start_dt_utc, end_dt_utc, config), fmt,
+                           on_rows=lambda n: job.update(message=f"{n:,} records exported..."))
 
-        # Display the styled HTML table
-        # st.markdown(styled_html, unsafe_allow_html=True)
 
+def _show_audit_result(artifact):
+    if artifact is None:
+        st.warning("No audit records found for that period.")
+    else:
+        preview_pdf(artifact)
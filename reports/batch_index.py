@@ -0,0 +1,143 @@
+# reports/batch_index.py
+"""
+Batch ID -> (start, end) for the Process Report.
+
+The Batch ID is logged in dbo.StringTable as TagIndex 1, one row per log
+time. SQL Server returns only the first and last row of each run of equal
+values (LAG/LEAD), so the index is built from the batch changes, not from
+every logged row:
+
+    B-1001  16/10/2026 06:00:00 - 16/10/2026 13:59:00
+    B-1002  16/10/2026 14:00:00 - ...
+
+It is kept in memory, shared by all sessions, and built incrementally:
+the first lookup scans the whole tag, later refreshes only rescan from the
+start of the last batch seen (which may still be running). A refresh is
+done at most every "batch_index_ttl" seconds (default 60, on the "Process"
+entry of db_config.json). A Batch ID that is not found triggers an early
+refresh, but at most one every "batch_index_miss_ttl" seconds (default 30),
+so typos don't keep scanning the historian. Look IDs up from a background
+job, not on every rerun: the first lookup scans the whole tag.
+
+A Batch ID that ran more than once maps to its first start and last end.
+"""
+import threading
+import time as _time
+from datetime import datetime
+
+from .db_pool import pooled_connection
+from .tag_store import BATCH_TAG
+
+DEFAULT_BATCH_INDEX_TTL = 60   # seconds
+DEFAULT_MISS_TTL = 30          # seconds between refreshes caused by unknown IDs
+
+SCAN_FROM = datetime(1900, 1, 1)   # first build: the whole tag
+
+# first and last row of every run of one Batch ID, in time order
+BATCH_RUNS_QUERY = """
+    WITH Logged AS (
+      SELECT
+        DateAndTime,
+        ISNULL(Val, '') AS Val,
+        LAG(ISNULL(Val, '')) OVER (ORDER BY DateAndTime) AS PrevVal,
+        LEAD(ISNULL(Val, '')) OVER (ORDER BY DateAndTime) AS NextVal
+      FROM dbo.StringTable
+      WHERE TagIndex = ?
+        AND DateAndTime >= ?
+    )
+    SELECT
+      DateAndTime,
+      Val,
+      CASE WHEN PrevVal IS NULL OR Val <> PrevVal THEN 1 ELSE 0 END AS RunStart
+    FROM Logged
+    WHERE PrevVal IS NULL OR Val <> PrevVal
+       OR NextVal IS NULL OR Val <> NextVal
+    ORDER BY DateAndTime;
+    """
+
+_lock = threading.Lock()
+_indexes = {}   # (server, database) -> _BatchIndex
+
+
+class _BatchIndex:
+    def __init__(self):
+        self.batches = {}        # Batch ID -> [start, end]
+        self.resume_from = None  # start of the last run; rescanned on refresh
+        self.refreshed_at = None
+
+
+def batch_runs(rows):
+    """
+    [(Batch ID, start, end)] from (DateAndTime, Val, RunStart) rows of
+    BATCH_RUNS_QUERY. Blank Batch IDs (no batch running) are left out.
+    """
+    runs = []
+    for stamp, val, run_start in rows:
+        if run_start or not runs:
+            runs.append([str(val).strip(), stamp, stamp])
+        else:
+            runs[-1][2] = stamp
+    return [tuple(run) for run in runs if run[0]]
+
+
+def _scan(config, since):
+    with pooled_connection(config, 'Process') as conn:
+        rows = conn.cursor().execute(BATCH_RUNS_QUERY, BATCH_TAG, since).fetchall()
+    return [(stamp, val, run_start) for stamp, val, run_start in rows]
+
+
+def _refresh(config, index):
+    rows = _scan(config, index.resume_from or SCAN_FROM)
+    runs = batch_runs(rows)
+    for batch_id, start, end in runs:
+        known = index.batches.get(batch_id)
+        if known is None:
+            index.batches[batch_id] = [start, end]
+        else:
+            known[0] = min(known[0], start)
+            known[1] = max(known[1], end)
+    if rows:
+        # the last run may go on; the next refresh starts from its first row
+        # (the first row of a scan always starts a run)
+        index.resume_from = max(stamp for stamp, _, run_start in rows if run_start)
+    index.refreshed_at = _time.monotonic()
+
+
+def _index_for(config):
+    db_config = config.get('Process', {})
+    key = (db_config.get('server'), db_config.get('database'))
+    index = _indexes.get(key)
+    if index is None:
+        index = _indexes[key] = _BatchIndex()
+    return index
+
+
+def _expired(config, index, key='batch_index_ttl', default=DEFAULT_BATCH_INDEX_TTL):
+    ttl = config.get('Process', {}).get(key, default)
+    return index.refreshed_at is None or _time.monotonic() - index.refreshed_at >= ttl
+
+
+def batch_window(config, batch_id):
+    """(start, end) of `batch_id` in StringTable time, or None if it never ran."""
+    batch_id = str(batch_id or '').strip()
+    if not batch_id:
+        return None
+    with _lock:
+        # refresh under the lock so concurrent sessions share one scan
+        index = _index_for(config)
+        fresh = _expired(config, index)
+        if fresh:
+            _refresh(config, index)
+        window = index.batches.get(batch_id)
+        if window is None and not fresh and _expired(config, index, 'batch_index_miss_ttl',
+                                                     DEFAULT_MISS_TTL):
+            # maybe it started since the last refresh
+            _refresh(config, index)
+            window = index.batches.get(batch_id)
+    return tuple(window) if window else None
+
+
+def invalidate_batch_index():
+    """Forget every index; the next lookup scans the whole tag again."""
+    with _lock:
+        _indexes.clear()
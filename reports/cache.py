@@ -0,0 +1,75 @@
+# reports/cache.py
+"""
+Small in-process cache for lookups shared by every Streamlit session.
+
+    users = TTLCache(ttl=30)
+    users.get(key, load_fn)
+
+- a value is reused until its TTL runs out;
+- concurrent callers asking for the same key while it is being loaded wait
+  for that one load instead of running their own (single-flight);
+- if a load fails, the last value that loaded fine is returned instead
+  (on_error is told about the failure). Only when there is none does the
+  error propagate.
+"""
+import threading
+import time as _time
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._values = {}      # key -> (expires_at, value)
+        self._last_good = {}   # key -> value, kept past expiry for fallback
+        self._inflight = {}    # key -> _Flight
+
+    def get(self, key, loader, ttl=None, on_error=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            hit = self._values.get(key)
+            if hit and hit[0] > _time.monotonic():
+                return hit[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if leader:
+            try:
+                flight.value = loader()
+            except Exception as e:
+                flight.error = e
+            with self._lock:
+                if flight.error is None:
+                    self._values[key] = (_time.monotonic() + ttl, flight.value)
+                    self._last_good[key] = flight.value
+                del self._inflight[key]
+            flight.done.set()
+        else:
+            flight.done.wait()
+
+        if flight.error is None:
+            return flight.value
+        with self._lock:
+            if key not in self._last_good:
+                raise flight.error
+            stale = self._last_good[key]
+        if on_error is not None:
+            on_error(flight.error)
+        return stale
+
+    def invalidate(self, key=None):
+        """Drop one key (or everything). Last-known values are kept."""
+        with self._lock:
+            if key is None:
+                self._values.clear()
+            else:
+                self._values.pop(key, None)
@@ -0,0 +1,278 @@
+# reports/db_pool.py
+"""
+Process-wide ODBC connection pool shared by the Process, Alarm and Audit reports.
+
+One pool per db_config.json entry. Use it as
+
+    with pooled_connection(config, 'Audit') as conn:
+        ...
+
+The connection goes back to the pool when the block ends (or is discarded
+if the block raised a database error), so nothing is leaked.
+
+Facts about the server that don't change while the pool lives (e.g. its
+machine name) are looked up once and kept with the pool:
+
+    name = pool_metadata(config, 'Audit', 'machine_name', load)   # load(conn)
+
+Optional per-entry settings in db_config.json:
+
+    "pool": {"max_size": 5, "idle_timeout": 300,
+             "health_check_after": 30, "checkout_timeout": 30}
+"""
+import threading
+import time as _time
+from contextlib import contextmanager
+
+DEFAULT_POOL_SETTINGS = {
+    'max_size': 5,              # connections per database entry
+    'idle_timeout': 300,        # seconds an unused connection is kept
+    'health_check_after': 30,   # ping connections idle longer than this
+    'checkout_timeout': 30,     # seconds to wait when the pool is exhausted
+}
+
+
+def connection_string(db_config):
+    """ODBC connection string for one db_config.json entry."""
+    if db_config['authentication'].lower() == 'windows':
+        return (
+            f"Driver={{{db_config['driver']}}};"
+            f"Server={db_config['server']};"
+            f"Database={db_config['database']};"
+            "Trusted_Connection=yes;"
+        )
+    return (
+        f"Driver={{{db_config['driver']}}};"
+        f"Server={db_config['server']};"
+        f"Database={db_config['database']};"
+        f"UID={db_config['username']};"
+        f"PWD={db_config['password']};"
+    )
+
+
+def _odbc_connect(conn_str):
+    import pyodbc
+    return pyodbc.connect(conn_str)
+
+
+class PoolTimeout(RuntimeError):
+    """No connection became free within checkout_timeout."""
+
+
+class ConnectionPool:
+    def __init__(self, connect, max_size=5, idle_timeout=300,
+                 health_check_after=30, checkout_timeout=30):
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.checkout_timeout = checkout_timeout
+
+        self._lock = threading.Condition()
+        self._idle = []          # [(conn, returned_at)], most recent last
+        self._in_use = 0
+        self._metadata = {}      # name -> value, for the lifetime of the pool
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'checkouts': 0,
+            'returned': 0,
+            'discarded': 0,
+            'evicted_idle': 0,
+            'health_check_failures': 0,
+            'timeouts': 0,
+            'wait_seconds': 0.0,
+            'metadata_loads': 0,
+        }
+
+    # -- checkout / return ---------------------------------------------
+    def checkout(self):
+        waited_from = _time.monotonic()
+        deadline = waited_from + self.checkout_timeout
+        with self._lock:
+            while True:
+                self._evict_idle_locked()
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use < self.max_size:
+                    conn, returned_at = None, None
+                    self._in_use += 1
+                    break
+                remaining = deadline - _time.monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No database connection free after {self.checkout_timeout}s "
+                        f"(max_size={self.max_size})")
+                self._lock.wait(remaining)
+            self._stats['checkouts'] += 1
+            self._stats['wait_seconds'] += _time.monotonic() - waited_from
+
+        # connect / ping outside the lock
+        try:
+            if conn is not None and _time.monotonic() - returned_at > self.health_check_after:
+                if not self._is_healthy(conn):
+                    with self._lock:
+                        self._stats['health_check_failures'] += 1
+                    self._close_quietly(conn)
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+                with self._lock:
+                    self._stats['created'] += 1
+            else:
+                with self._lock:
+                    self._stats['reused'] += 1
+            return conn
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                self._lock.notify()
+            raise
+
+    def checkin(self, conn, discard=False):
+        if not discard:
+            try:
+                # end the implicit transaction pyodbc opened (autocommit off)
+                conn.rollback()
+            except Exception:
+                discard = True
+        if discard:
+            self._close_quietly(conn)
+        with self._lock:
+            self._in_use -= 1
+            if discard:
+                self._stats['discarded'] += 1
+            else:
+                self._idle.append((conn, _time.monotonic()))
+                self._stats['returned'] += 1
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.checkout()
+        discard = False
+        try:
+            yield conn
+        except Exception as e:
+            # a broken connection must not go back to the pool
+            discard = _is_connection_error(e)
+            raise
+        finally:
+            # also runs when a streaming generator is closed early
+            self.checkin(conn, discard=discard)
+
+    # -- server metadata -----------------------------------------------
+    def metadata(self, name, load, conn=None):
+        """
+        load(conn) the first time `name` is asked for, the cached value after.
+        Pass `conn` when already holding one of this pool's connections, so
+        a miss doesn't wait for a second one.
+        """
+        with self._lock:
+            if name in self._metadata:
+                return self._metadata[name]
+        # query outside the lock; two threads racing on a miss both load
+        if conn is not None:
+            value = load(conn)
+        else:
+            with self.connection() as borrowed:
+                value = load(borrowed)
+        with self._lock:
+            self._stats['metadata_loads'] += 1
+            return self._metadata.setdefault(name, value)
+
+    # -- housekeeping --------------------------------------------------
+    def evict_idle(self):
+        with self._lock:
+            self._evict_idle_locked()
+
+    def _evict_idle_locked(self):
+        now = _time.monotonic()
+        keep = []
+        for conn, returned_at in self._idle:
+            if now - returned_at > self.idle_timeout:
+                self._close_quietly(conn)
+                self._stats['evicted_idle'] += 1
+            else:
+                keep.append((conn, returned_at))
+        self._idle = keep
+
+    def close_all(self):
+        with self._lock:
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._idle = []
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._stats,
+                        in_use=self._in_use,
+                        idle=len(self._idle),
+                        max_size=self.max_size)
+
+    @staticmethod
+    def _is_healthy(conn):
+        try:
+            conn.cursor().execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _is_connection_error(exc):
+    # pyodbc reports a dead link as OperationalError / InterfaceError;
+    # checked by name so pyodbc isn't needed to import this module
+    return type(exc).__name__ in ('OperationalError', 'InterfaceError')
+
+
+# (db_name, connection string) -> ConnectionPool
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config, db_name='Process'):
+    db_config = config.get(db_name, {})
+    if not db_config:
+        raise ValueError(f"Database configuration for {db_name} not found")
+
+    conn_str = connection_string(db_config)
+    key = (db_name, conn_str)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            # db_config.json changed for this entry - retire the old pool
+            for old_key in [k for k in _pools if k[0] == db_name]:
+                _pools.pop(old_key).close_all()
+            settings = dict(DEFAULT_POOL_SETTINGS, **db_config.get('pool', {}))
+            pool = ConnectionPool(lambda: _odbc_connect(conn_str), **settings)
+            _pools[key] = pool
+    return pool
+
+
+@contextmanager
+def pooled_connection(config, db_name='Process'):
+    """Borrow a connection for `db_name` from the shared pool."""
+    with get_pool(config, db_name).connection() as conn:
+        yield conn
+
+
+def pool_metadata(config, db_name, name, load, conn=None):
+    """Cached server fact for `db_name`, see ConnectionPool.metadata."""
+    return get_pool(config, db_name).metadata(name, load, conn)
+
+
+def pool_metrics():
+    """{db_name: metrics} for every pool created so far."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    return {db_name: pool.metrics() for (db_name, _), pool in pools}
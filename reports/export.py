@@ -0,0 +1,136 @@
+# reports/export.py
+"""
+Report data as CSV, Parquet or Excel, written as the rows arrive.
+
+The exports skip the PDF layout entirely: frames come straight off the DB
+cursor (fetch.query_frames) and each one is appended to the file and
+dropped, so memory stays at one batch however long the range is.
+
+    csv      pandas to_csv, one batch at a time
+    parquet  pyarrow ParquetWriter, one row group per batch
+    xlsx     openpyxl write-only workbook (rows are streamed to disk;
+             a new sheet is started every XLSX_MAX_ROWS rows)
+
+    artifact = export_artifact(frames, 'xlsx', on_rows=...)   # artifacts.py
+
+Values are written as they are (numbers stay numbers, timestamps stay
+timestamps), not as the display strings of the PDF.
+"""
+import pandas as pd
+
+from .artifacts import stream_to_artifact
+from .pdf_stream import counted_chunks
+
+EXPORT_FORMATS = {
+    'csv': 'CSV',
+    'xlsx': 'Excel',
+    'parquet': 'Parquet',
+}
+
+XLSX_MAX_ROWS = 1_048_575   # Excel's limit, less the header row
+CSV_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')  # BOM so Excel reads UTF-8
+        self._header = True
+
+    def write(self, frame):
+        frame.to_csv(self._file, header=self._header, index=False,
+                     date_format=CSV_DATE_FORMAT)
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path):
+        self._path = path
+        self._writer = None
+        self._schema = None
+
+    def write(self, frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if self._writer is None:
+            self._schema = _arrow_schema(frame)
+            self._writer = pq.ParquetWriter(self._path, self._schema)
+        self._writer.write_table(
+            pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+class XlsxWriter:
+    def __init__(self, path):
+        from openpyxl import Workbook
+        self._path = path
+        self._book = Workbook(write_only=True)
+        self._sheet = None
+        self._columns = None
+        self._sheet_rows = 0
+
+    def write(self, frame):
+        if self._columns is None:
+            self._columns = list(frame.columns)
+        # NaN / NaT -> empty cell; Timestamps are datetimes, so they stay dates
+        rows = frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+        for row in rows:
+            if self._sheet is None or self._sheet_rows >= XLSX_MAX_ROWS:
+                self._new_sheet()
+            self._sheet.append(row)
+            self._sheet_rows += 1
+
+    def _new_sheet(self):
+        number = len(self._book.worksheets) + 1
+        self._sheet = self._book.create_sheet("Report" if number == 1 else f"Report {number}")
+        self._sheet.append(self._columns)
+        self._sheet_rows = 0
+
+    def close(self):
+        if self._sheet is None:
+            self._book.create_sheet("Report")
+        self._book.save(self._path)
+
+
+WRITERS = {'csv': CsvWriter, 'parquet': ParquetWriter, 'xlsx': XlsxWriter}
+
+
+def _arrow_schema(frame):
+    import pyarrow as pa
+    # text columns are strings even if the first batch is all NULL
+    return pa.schema([
+        field if (pd.api.types.is_numeric_dtype(frame[field.name])
+                  or pd.api.types.is_datetime64_any_dtype(frame[field.name]))
+        else pa.field(field.name, pa.string())
+        for field in pa.Schema.from_pandas(frame, preserve_index=False)])
+
+
+def write_export(frames, fmt, output):
+    """Write every frame of `frames` to the file `output`; returns the row count."""
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    writer = WRITERS[fmt](output)
+    rows = 0
+    try:
+        for frame in frames:
+            if frame.empty:
+                continue
+            writer.write(frame)
+            rows += len(frame)
+    finally:
+        writer.close()
+    return rows
+
+
+def export_artifact(frames, fmt, on_rows=None):
+    """
+    Export into the artifact store: (Artifact, rows), or (None, 0) if there
+    was nothing to write. on_rows(n) is told the running row count.
+    """
+    return stream_to_artifact(
+        lambda path: write_export(counted_chunks(frames, on_rows), fmt, path), '.' + fmt)
@@ -0,0 +1,126 @@
+# reports/fetch.py
+"""
+Cursor -> DataFrame without going through pd.read_sql.
+
+pd.read_sql on a raw pyodbc connection fetches everything as Row objects,
+copies them into tuples and builds the frame row by row (and warns that
+only SQLAlchemy connections are supported). Here rows are fetched
+`batch_size` at a time with fetchmany, each batch is transposed once
+(zip(*rows)), and every column goes straight into a typed NumPy array
+chosen from cursor.description:
+
+    float / Decimal  -> float64 (NULL -> NaN)
+    int / bool       -> int64 / bool, or float64 if the batch has NULLs
+    datetime         -> datetime64[ns] (NULL -> NaT)
+    anything else    -> object
+
+    df = read_frame(conn, query, params)                  # whole result
+    for frame in query_frames(config, 'Alarms', query, params):
+        ...                                               # one batch at a time
+
+The batch size can be set per db_config.json entry with "fetch_batch_size".
+"""
+import datetime as _dt
+import decimal
+
+import numpy as np
+import pandas as pd
+
+from .db_pool import pooled_connection
+
+DEFAULT_BATCH_SIZE = 5000
+
+_FLOAT_TYPES = (float, decimal.Decimal)
+_INT_TYPES = (int,)
+
+
+def batch_size_for(config, db_name):
+    return config.get(db_name, {}).get('fetch_batch_size', DEFAULT_BATCH_SIZE)
+
+
+def _column_kind(type_code):
+    if type_code is bool:
+        return 'bool'
+    if isinstance(type_code, type) and issubclass(type_code, _FLOAT_TYPES):
+        return 'float'
+    if isinstance(type_code, type) and issubclass(type_code, _INT_TYPES):
+        return 'int'
+    if type_code is _dt.datetime:
+        return 'datetime'
+    return 'object'
+
+
+def _column_array(values, kind):
+    if kind == 'float':
+        # None -> NaN
+        return np.array(values, dtype='float64')
+    if kind in ('int', 'bool'):
+        if any(v is None for v in values):
+            return np.array(values, dtype='float64')
+        return np.array(values, dtype='int64' if kind == 'int' else 'bool')
+    if kind == 'datetime':
+        # None -> NaT; pandas' converter is ~10x faster than np.array here
+        return pd.to_datetime(_object_array(values)).to_numpy()
+    return _object_array(values)
+
+
+def _object_array(values):
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+def _empty_frame(columns, kinds):
+    dtypes = {'float': 'float64', 'int': 'int64', 'bool': 'bool',
+              'datetime': 'datetime64[ns]', 'object': object}
+    return pd.DataFrame({c: pd.Series(dtype=dtypes[k]) for c, k in zip(columns, kinds)},
+                        columns=columns)
+
+
+def iter_cursor_frames(cursor, batch_size=DEFAULT_BATCH_SIZE):
+    """Frames of at most `batch_size` rows from an executed cursor."""
+    columns = [c[0] for c in cursor.description]
+    kinds = [_column_kind(c[1]) for c in cursor.description]
+    cursor.arraysize = batch_size
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        # one transpose per batch, then one typed array per column
+        data = {c: _column_array(values, kind)
+                for c, kind, values in zip(columns, kinds, zip(*rows))}
+        yield pd.DataFrame(data, columns=columns, copy=False)
+
+
+def read_frame(conn, query, params=None, batch_size=DEFAULT_BATCH_SIZE):
+    """The whole result of `query` as one DataFrame (typed even when empty)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params or [])
+        if cursor.description is None:
+            return pd.DataFrame()
+        frames = list(iter_cursor_frames(cursor, batch_size))
+        if not frames:
+            return _empty_frame([c[0] for c in cursor.description],
+                                [_column_kind(c[1]) for c in cursor.description])
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+    finally:
+        cursor.close()
+
+
+def query_frames(config, db_name, query, params=None, batch_size=None):
+    """
+    Run `query` on a pooled connection for `db_name` and yield frames of at
+    most `batch_size` rows. The connection is held until the generator is
+    exhausted or closed.
+    """
+    batch_size = batch_size or batch_size_for(config, db_name)
+    with pooled_connection(config, db_name) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params or [])
+            yield from iter_cursor_frames(cursor, batch_size)
+        finally:
+            cursor.close()
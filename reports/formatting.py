@@ -0,0 +1,57 @@
+# reports/formatting.py
+"""
+Display formatting for report frames, done per column instead of one
+Python call per cell. Historian readings repeat a lot (a flow meter sits at
+0.00 for hours), so values are rounded as an array and only the distinct
+ones are turned into strings.
+
+get_report_data keeps sensor values numeric; the PDF and the on-screen
+preview both call format_report_frame() to get the strings they show.
+Missing readings are shown as NA_DISPLAY instead of "nan".
+"""
+import numpy as np
+import pandas as pd
+
+NA_DISPLAY = '-'
+
+
+def format_fixed(values, decimals=2, na_rep=NA_DISPLAY):
+    """
+    Numbers -> strings with exactly `decimals` decimals ("12.30", "-0.05"),
+    rounded the same way as DataFrame.round().
+    """
+    # + 0.0 turns -0.0 into 0.0, so tiny negatives don't print as "-0.00"
+    rounded = np.round(np.asarray(values, dtype='float64'), decimals) + 0.0
+    codes, uniques = pd.factorize(rounded)   # NaN -> code -1
+    fmt = f'%.{decimals}f'
+    labels = np.array([fmt % v for v in uniques.tolist()] + [na_rep], dtype=object)
+    return labels[codes]
+
+
+def split_date_time(timestamps, date_format='%d-%m-%Y', time_format='%H:%M'):
+    """
+    (Date, Time) string arrays for a datetime Series. Only the distinct
+    days and distinct minutes are run through strftime.
+    """
+    ts = pd.to_datetime(timestamps)
+    days = ts.dt.normalize()
+    day_codes, day_values = pd.factorize(days)
+    dates = np.asarray(day_values.strftime(date_format), dtype=object)[day_codes]
+
+    minute_of_day = (ts - days).dt.total_seconds().floordiv(60).astype('int64')
+    minute_codes, minute_values = pd.factorize(minute_of_day)
+    labels = (pd.Timestamp(0) + pd.to_timedelta(minute_values, unit='min')).strftime(time_format)
+    times = np.asarray(labels, dtype=object)[minute_codes]
+    return dates, times
+
+
+def format_report_frame(df, decimals=2, na_rep=NA_DISPLAY):
+    """A copy of `df` with every cell as its display string."""
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            out[col] = format_fixed(values.to_numpy(), decimals, na_rep)
+        else:
+            out[col] = values.astype(object).where(values.notna(), na_rep).astype(str)
+    return pd.DataFrame(out, index=df.index, columns=df.columns)
@@ -0,0 +1,105 @@
+# reports/job_view.py
+"""
+Streamlit side of the report jobs (see jobs.py).
+
+    if st.button("Generate Report"):
+        start_report_job('alarm', build_alarm_job, ...)
+    show_report_job('alarm', render_alarm_result)
+
+The job id lives in st.session_state, so every rerun finds the same job:
+while it runs a small fragment polls its progress, and once it is done
+`render(job.result)` draws the result on every rerun until the next
+Generate click replaces it. PDFs are shown from the artifact store by URL.
+
+Exports (export.py) run the same way, as an "<kind>_export" job:
+
+    export_controls('alarm', build_alarm_export, ...)   # fn(job, ..., fmt)
+"""
+import streamlit as st
+
+from .export import EXPORT_FORMATS
+from .jobs import FAILED, JobQueueFull, get_job, submit_job
+
+SESSION_KEY = 'report_jobs'   # {report kind: job id}
+POLL_SECONDS = 1
+
+
+def start_report_job(kind, fn, *args, label=''):
+    try:
+        job = submit_job(kind, fn, *args, label=label)
+    except JobQueueFull as e:
+        st.warning(str(e))
+        return None
+    st.session_state.setdefault(SESSION_KEY, {})[kind] = job.id
+    return job
+
+
+def show_report_job(kind, render):
+    job = get_job(st.session_state.get(SESSION_KEY, {}).get(kind))
+    if job is None:
+        return
+    if not job.finished:
+        _job_progress(job.id)
+    elif job.status == FAILED:
+        st.error(f"Report failed: {job.error}")
+    else:
+        render(job.result)
+
+
+def preview_pdf(artifact):
+    """Preview (and print) a finished PDF by URL, see artifacts.py."""
+    if not artifact.exists():
+        st.info("This report has expired, please generate it again.")
+        return
+    # Inject HTML + JS to display and auto-print the PDF
+    st.markdown(f"""
+        <style>
+            .pdf-container {{
+                width: 100%;
+                height: 80vh;
+                border: none;
+            }}
+        </style>
+        <h4>📄 Previewing Report </h4>
+        <a href="{artifact.url}" download>📥 Download PDF</a>
+        <iframe class="pdf-container" 
+                src="{artifact.url}" 
+                type="application/pdf"
+                onload="this.contentWindow.print();">
+        </iframe>
+    """, unsafe_allow_html=True)
+
+
+def export_controls(kind, fn, *args, label=''):
+    """Format picker + Export button; fn(job, *args, fmt) returns (Artifact or None, rows)."""
+    col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
+    with col1:
+        fmt = st.selectbox("Export Data", options=list(EXPORT_FORMATS),
+                           format_func=EXPORT_FORMATS.get, key=f"{kind}_export_format")
+    with col2:
+        if st.button("Export", key=f"{kind}_export"):
+            start_report_job(f"{kind}_export", fn, *args, fmt,
+                             label=f"{label} ({EXPORT_FORMATS[fmt]})")
+    show_report_job(f"{kind}_export", _show_export)
+
+
+def _show_export(result):
+    artifact, rows = result
+    if artifact is None:
+        st.warning("No data to export for the selected period.")
+    elif not artifact.exists():
+        st.info("This export has expired, please export it again.")
+    else:
+        size_mb = artifact.size / (1024 * 1024)
+        st.markdown(f'<a href="{artifact.url}" download>📥 Download export</a> '
+                    f'({rows:,} rows, {size_mb:.1f} MB)', unsafe_allow_html=True)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _job_progress(job_id):
+    job = get_job(job_id)
+    if job is None or job.finished:
+        # redraw the whole page once, now with the result
+        st.rerun()
+    status, progress, message = job.snapshot()
+    st.progress(progress, text=message)
@@ -0,0 +1,151 @@
+# reports/jobs.py
+"""
+Background report jobs.
+
+show() used to fetch the data and build the PDF in the Streamlit script
+thread, so a long report froze the page and any widget change (which reruns
+the script) threw the work away. Now show() only submits a job:
+
+    job = submit_job('alarm', build_alarm_job, start, end, config, params)
+    st.session_state[...] = job.id
+
+The work runs on a small shared thread pool. `fn(job, *args)` can call
+job.update(progress, message) as it goes; what it returns is kept on the
+job as job.result. The report files themselves are written to
+static/reports (artifacts.py); the job keeps only the artifact that points
+at them. Finished jobs are remembered for "keep_finished_minutes", so a
+rerun, or a second look a few minutes later, picks up the result instead
+of starting over.
+
+Threads rather than processes: most of the time is spent waiting on SQL
+Server; big Process Report PDFs can hand their layout to worker processes
+of their own ("render_workers", see process_pdf.py).
+"""
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+DEFAULT_JOB_SETTINGS = {
+    'max_workers': 2,              # reports built at the same time
+    'max_pending': 10,             # queued + running before submit is refused
+    'keep_finished_minutes': 30,   # how long finished results are kept
+}
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class JobQueueFull(RuntimeError):
+    """Too many reports are already queued or running."""
+
+
+class Job:
+    def __init__(self, kind, label=''):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = 'Waiting for a free worker...'
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def update(self, progress=None, message=None):
+        """Called from the job function to report how far it got (0..1)."""
+        with self._lock:
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, float(progress)))
+            if message is not None:
+                self.message = message
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def snapshot(self):
+        """(status, progress, message) read together."""
+        with self._lock:
+            return self.status, self.progress, self.message
+
+
+class JobQueue:
+    def __init__(self, max_workers=2, max_pending=10, keep_finished_minutes=30):
+        self.max_pending = max_pending
+        self.keep_finished = timedelta(minutes=keep_finished_minutes)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='report-job')
+        self._lock = threading.Lock()
+        self._jobs = {}   # id -> Job
+
+    def submit(self, kind, fn, *args, label='', **kwargs):
+        self.sweep()
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if not j.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFull(
+                    f"{pending} reports are already being built, please try again shortly")
+            job = Job(kind, label)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        with job._lock:
+            job.status = RUNNING
+            job.message = 'Starting...'
+        try:
+            result = fn(job, *args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            with job._lock:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = FAILED
+                job.finished_at = datetime.now()
+            return
+        with job._lock:
+            job.result = result
+            job.progress = 1.0
+            job.message = 'Done'
+            job.status = DONE
+            job.finished_at = datetime.now()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def sweep(self):
+        """Forget finished jobs older than keep_finished_minutes."""
+        cutoff = datetime.now() - self.keep_finished
+        with self._lock:
+            for job_id in [i for i, j in self._jobs.items()
+                           if j.finished and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """The process-wide queue shared by every Streamlit session."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(**DEFAULT_JOB_SETTINGS)
+        return _queue
+
+
+def submit_job(kind, fn, *args, label='', **kwargs):
+    return get_job_queue().submit(kind, fn, *args, label=label, **kwargs)
+
+
+def get_job(job_id):
+    return get_job_queue().get(job_id) if job_id else None
@@ -0,0 +1,65 @@
+# reports/latest_user.py
+"""
+"Printed By" on every report: the user who last logged in on the plant,
+from the Audit database. No Streamlit here; problems are logged and, if
+the caller wants to show them, passed to on_warning:
+
+    get_latest_user(config, on_warning=st.warning)   # web app
+    get_latest_user(config)                          # cli.py
+"""
+import logging
+
+from .audit_filter import SERVICE_ACCOUNT_FILTER, service_account_params
+from .cache import TTLCache
+from .db_pool import pooled_connection
+
+log = logging.getLogger(__name__)
+
+NO_USER = "[no user logged in]"
+
+DEFAULT_USER_CACHE_TTL = 30  # seconds
+
+# shared by all sessions: at shift change every station asks at once
+_latest_user_cache = TTLCache(ttl=DEFAULT_USER_CACHE_TTL)
+
+# same service accounts as the Audit Report leaves out (audit_filter.py)
+LATEST_USER_QUERY = f"""
+        SELECT TOP (1)
+            DATEADD(SECOND, 9900, TimeStmp) AS TimeStmp,
+            UserID
+        FROM AuditReport
+        WHERE {SERVICE_ACCOUNT_FILTER}
+        ORDER BY TimeStmp DESC;
+        """
+
+
+def _query_latest_user(config):
+    with pooled_connection(config, 'Audit') as conn:
+        cursor = conn.cursor()
+        cursor.execute(LATEST_USER_QUERY, service_account_params(config, conn))
+        result = cursor.fetchone()
+        return result[1] if result else NO_USER
+
+
+def get_latest_user(config, on_warning=None):
+    """
+    Latest logged-in user from AuditReport, cached for a few seconds
+    ("user_cache_ttl" on the Audit entry). Concurrent callers share one
+    query; if it fails the last user seen is returned, or NO_USER.
+    """
+    def warn(message):
+        log.warning(message)
+        if on_warning is not None:
+            on_warning(message)
+
+    audit = config.get('Audit', {})
+    key = (audit.get('server'), audit.get('database'))
+    ttl = audit.get('user_cache_ttl', DEFAULT_USER_CACHE_TTL)
+    try:
+        return _latest_user_cache.get(
+            key, lambda: _query_latest_user(config), ttl=ttl,
+            on_error=lambda e: warn(
+                f"Could not fetch user from AuditReport, using last known user: {str(e)}"))
+    except Exception as e:
+        warn(f"Could not fetch user from AuditReport: {str(e)}")
+        return NO_USER
@@ -0,0 +1,111 @@
+# reports/pdf_stream.py
+"""
+Streaming PDF builds for long Alarm/Audit ranges.
+
+Instead of one DataFrame -> one list of lists -> one huge Table, rows are
+pulled from the DB cursor `chunk_size` at a time and turned into fixed-size
+tables of `rows_per_table` rows. reportlab is handed a FlowableStream, which
+only produces the next table when the layout engine asks for it, so the
+rows never sit in memory all at once. The finished pages still do:
+reportlab keeps each page stream until the file is saved, so memory grows
+with the page count, only much more slowly than with one big Table.
+"""
+import pandas as pd
+
+from .fetch import query_frames
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_ROWS_PER_TABLE = 40   # about one A4 page of 7pt rows
+
+# ranges longer than this are rendered with the streaming PDF builder
+STREAMING_MIN_DAYS = 7
+
+
+class FlowableStream(list):
+    """
+    A story list for doc.build() that pulls flowables from an iterator on
+    demand. reportlab only ever looks at the head of the story, inserts split
+    remainders at the front and deletes from the front, so keeping a one-item
+    buffer is enough.
+    """
+
+    def __init__(self, source):
+        super().__init__()
+        self._source = iter(source)
+
+    def _fill(self):
+        if not list.__len__(self):
+            nxt = next(self._source, None)
+            if nxt is not None:
+                self.append(nxt)
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, i):
+        self._fill()
+        return list.__getitem__(self, i)
+
+
+def iter_query_chunks(config, db_name, query, params, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Run `query` on a pooled connection and yield DataFrames of at most
+    `chunk_size` rows (see fetch.query_frames). The connection is held
+    until the generator is exhausted or closed.
+    """
+    return query_frames(config, db_name, query, params, chunk_size)
+
+
+def drop_repeated(chunks, key_cols, time_cols):
+    """
+    drop_duplicates(subset=key_cols) across a stream of time-ordered chunks.
+    Rows can only repeat within the same `time_cols` value, so only the keys
+    of the last timestamp are carried from one chunk to the next (and added
+    to while chunks keep ending on that same timestamp).
+    """
+    carry, carry_time = set(), None
+    for chunk in chunks:
+        chunk = chunk.drop_duplicates(subset=key_cols)
+        if chunk.empty:
+            continue
+        if carry:
+            keys = pd.MultiIndex.from_frame(chunk[key_cols])
+            chunk = chunk[~keys.isin(carry)]
+            if chunk.empty:
+                continue
+        last = chunk[time_cols].iloc[-1]
+        tail = chunk[(chunk[time_cols] == last).all(axis=1)]
+        tail_keys = set(pd.MultiIndex.from_frame(tail[key_cols]))
+        if tuple(last) == carry_time:
+            # the whole chunk is at the previous tail's timestamp
+            carry |= tail_keys
+        else:
+            carry, carry_time = tail_keys, tuple(last)
+        yield chunk
+
+
+def counted_chunks(chunks, on_rows=None):
+    """Pass chunks through, calling on_rows(rows so far) after each one."""
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        if on_rows is not None:
+            on_rows(rows)
+        yield chunk
+
+
+def table_flowables(chunks, make_table, rows_per_table=DEFAULT_ROWS_PER_TABLE):
+    """
+    Re-cut a stream of DataFrames into tables of exactly `rows_per_table`
+    rows (the last one may be shorter). make_table(rows) gets a list of
+    row lists without the header and returns a flowable.
+    """
+    pending = []
+    for chunk in chunks:
+        pending.extend(chunk.astype(str).values.tolist())
+        while len(pending) >= rows_per_table:
+            yield make_table(pending[:rows_per_table])
+            del pending[:rows_per_table]
+    if pending:
+        yield make_table(pending)
@@ -0,0 +1,127 @@
+# reports/process_data.py
+"""
+Process Report data access, without Streamlit: the tag list and the
+sampled, pivoted process data, whole (get_report_data, for the PDF and
+preview) or a cursor batch at a time (iter_report_data, for exports).
+With a batch_id only the rows logged under that Batch ID are kept; the
+window of a batch comes from batch_index.batch_window.
+"""
+import pandas as pd
+
+from .process_query import build_report_query, REPORT_ENGINES
+from .tag_store import read_long_report
+from .db_pool import pooled_connection, connection_string, _odbc_connect
+from .tag_catalog import get_tag_catalog, tag_pairs
+from .result_cache import cached_fetch
+from .fetch import read_frame, batch_size_for, query_frames
+from .formatting import split_date_time
+
+
+def get_db_connection(config, db_name='Process'):
+    """Open a new, unpooled connection. Reports use pooled_connection instead."""
+    db_config = config.get(db_name, {})
+    
+    if not db_config:
+        raise ValueError(f"Database configuration for {db_name} not found")
+    
+    return _odbc_connect(connection_string(db_config))
+
+
+
+def get_tag_options(config):
+    """
+    Get available tag names in the exact order used by get_report_data().
+    Served from the process-wide tag catalogue, so Streamlit reruns don't
+    query the database.
+    """
+    return get_tag_catalog(config)[['DisplayName']]
+
+
+
+def get_report_data(start_datetime, end_datetime, selected_tags, batch_id=None, config=None,
+                    interval=1, aggregation='first'):
+    """
+    Get report data by pivoting StringTable (Batch/User) and FloatTable (sensors) in SQL,
+    sampled to one row per `interval` minutes ('first', 'avg', 'min' or 'max' per bucket).
+    Tag columns stay numeric (NaN where there was no reading). With `batch_id`
+    only that batch's rows are kept.
+    """
+    if not selected_tags:
+        return pd.DataFrame()
+
+    # tag order doesn't change the rows, so one cache entry serves any order
+    tags = sorted(set(selected_tags))
+    catalog = tag_pairs(config)
+    engine = config['Process'].get('engine', 'pivot')
+    if engine not in REPORT_ENGINES:
+        raise ValueError(f"Unknown Process engine '{engine}'")
+
+    def fetch(range_start, range_end):
+        with pooled_connection(config, 'Process') as conn:
+            if engine == 'long':
+                # raw rows of the picked tags, pivoted here (see tag_store)
+                return read_long_report(
+                    conn, range_start, range_end, tags,
+                    interval=interval, aggregation=aggregation, catalog=catalog,
+                    batch_size=batch_size_for(config, 'Process'))
+            # pivot only the rows inside the window (see process_query)
+            query, params = build_report_query(
+                range_start, range_end, tags,
+                interval=interval, aggregation=aggregation, catalog=catalog)
+            return read_frame(conn, query, params, batch_size_for(config, 'Process'))
+
+    # closed hours come from the local result cache, only the rest from SQL
+    df = cached_fetch(config, 'Process', 'process', (tuple(tags), interval, aggregation, engine),
+                      start_datetime, end_datetime, fetch, 'DateAndTime',
+                      step_minutes=interval)
+    if batch_id:
+        # filtered here, not in SQL, so the cached hours serve every batch
+        df = _only_batch(df, batch_id)
+    if not df.empty:
+        # columns in the order the tags were picked
+        df = df[[c for c in df.columns if c not in tags] + list(dict.fromkeys(selected_tags))]
+        df['DateAndTime'] = pd.to_datetime(df['DateAndTime'])
+        df['Date'], df['Time'] = split_date_time(df['DateAndTime'])
+        # values stay numeric; format_report_frame() makes the display strings
+        df = df.drop_duplicates(subset=['Date','Time'])
+    return df
+
+
+def iter_report_data(start_datetime, end_datetime, selected_tags, config,
+                     interval=1, aggregation='first', batch_size=None, batch_id=None):
+    """
+    Same rows as get_report_data, as frames [DateAndTime, Batch ID, User ID,
+    tags...] read from the cursor a batch at a time, for the exports. The
+    'long' engine pivots in memory, so it comes as a single frame.
+    """
+    if not selected_tags:
+        return
+    tags = sorted(set(selected_tags))
+    catalog = tag_pairs(config)
+    engine = config['Process'].get('engine', 'pivot')
+    if engine not in REPORT_ENGINES:
+        raise ValueError(f"Unknown Process engine '{engine}'")
+    columns = ['DateAndTime', 'Batch ID', 'User ID'] + list(dict.fromkeys(selected_tags))
+
+    if engine == 'long':
+        with pooled_connection(config, 'Process') as conn:
+            frames = [read_long_report(
+                conn, start_datetime, end_datetime, tags,
+                interval=interval, aggregation=aggregation, catalog=catalog,
+                batch_size=batch_size_for(config, 'Process'))]
+    else:
+        query, params = build_report_query(
+            start_datetime, end_datetime, tags,
+            interval=interval, aggregation=aggregation, catalog=catalog)
+        frames = query_frames(config, 'Process', query, params, batch_size)
+    for frame in frames:
+        if batch_id:
+            frame = _only_batch(frame, batch_id)
+        frame['DateAndTime'] = pd.to_datetime(frame['DateAndTime'])
+        yield frame[columns]
+
+
+def _only_batch(df, batch_id):
+    if df.empty:
+        return df
+    return df[df['Batch ID'].astype(str).str.strip() == str(batch_id).strip()].copy()
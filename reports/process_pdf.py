@@ -0,0 +1,258 @@
+# reports/process_pdf.py
+"""
+Process Report PDF, without Streamlit: one table per group of tag columns
+under the shared page layout (report_doc.py), optionally laid out in
+worker processes for big reports.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import BytesIO
+from itertools import islice
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Paragraph, Table, TableStyle, PageBreak
+
+from .formatting import format_report_frame
+from .report_doc import report_doc, NumberedCanvas
+
+# margins are the shared ones in report_doc
+PAGE_SIZE = A4
+
+FIXED_COLUMNS = ['Date', 'Time']
+MAX_DATA_COLS_PER_PAGE = 8  # Reduced to fit with header
+
+# parallel rendering (see generate_pdf_report); set per entry in db_config.json
+# as "Process": {"render_workers": 4}
+PARALLEL_MIN_ROWS = 5000
+
+
+def generate_pdf_report(df, title="Process Data Report", params=None, units=None, workers=0):
+    """
+    PDF bytes for the report: one table per group of MAX_DATA_COLS_PER_PAGE
+    tag columns, each group starting on a new page.
+
+    With workers > 1 and a big enough frame, the groups are laid out in
+    separate processes and the pages merged afterwards (needs pypdf);
+    otherwise everything is built here in one document.
+    """
+    params = params or {}
+    # same "Printed Date" on every page, whichever process draws it
+    printed_date = datetime.now().strftime('%d/%m/%Y %H:%M')
+    # one pass over the whole frame, not per cell per column chunk
+    df = format_report_frame(df)
+    sections = _column_sections(df)
+
+    if (workers and workers > 1 and len(sections) > 1
+            and len(df) >= PARALLEL_MIN_ROWS and _pypdf_available()):
+        return _generate_pdf_parallel(df, sections, params, units, printed_date, workers)
+
+    buffer = BytesIO()
+    doc = _process_doc(buffer, params, printed_date)
+
+    # Prepare the story (content)
+    story = []
+    for i, cols in enumerate(sections):
+        story.append(_section_table(df[FIXED_COLUMNS + cols], units))
+        if i < len(sections) - 1:
+            story.append(PageBreak())
+
+    # Build the document
+    doc.build(story, canvasmaker=NumberedCanvas)
+
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+def process_report_pdf(df, start_datetime, end_datetime, selected_tags, batch_id,
+                       printed_by, units=None, workers=0):
+    """The Process Report PDF for a get_report_data frame."""
+    # Drop original DateAndTime and unnecessary columns
+    df = df.drop(columns=['DateAndTime', 'Batch ID', 'User ID'], errors='ignore')
+    # Reorder columns: Date first, Time second, then the rest
+    cols = ['Date', 'Time'] + [col for col in df.columns if col not in ['Date', 'Time']]
+    df = df[cols]
+
+    report_params = {
+        "FROM DATE": start_datetime.strftime('%d/%m/%Y %H:%M'),
+        "TO DATE": end_datetime.strftime('%d/%m/%Y %H:%M'),
+        "BATCH ID": batch_id or "Not specified",
+        "TAGS SELECTED": ", ".join(selected_tags),
+        "RECORD COUNT": len(df),
+        "Printed By": printed_by
+    }
+    return generate_pdf_report(df, params=report_params, units=units, workers=workers)
+
+
+def _column_sections(df):
+    """Tag columns in groups of MAX_DATA_COLS_PER_PAGE ([] for an empty frame)."""
+    if df.empty:
+        return []
+    # Remove BatchID and UserID from DataFrame
+    data_cols = [col for col in df.columns
+                 if col not in FIXED_COLUMNS and col not in ['BatchID', 'UserID']]
+
+    # Build Table in chunks
+    def chunk_list(lst, size):
+        """Helper: Yield successive chunks of list"""
+        it = iter(lst)
+        return iter(lambda: list(islice(it, size)), [])
+
+    return list(chunk_list(data_cols, MAX_DATA_COLS_PER_PAGE))
+
+
+def _section_table(sub_df, units):
+    # Prepare table data with units below column names
+    styles = getSampleStyleSheet()
+    styles["Normal"].alignment = TA_CENTER
+    # Create a custom style for centered headers
+    centered_header_style = ParagraphStyle(
+        name='CenteredHeader',
+        parent=styles['Normal'],
+        alignment=TA_CENTER,  # Horizontal centering
+        spaceBefore=0,        # Remove extra space before the paragraph
+        spaceAfter=0          # Remove extra space after the paragraph
+    )
+    header = []
+    for col in sub_df.columns:
+        if units and units.get(col):
+            header.append(Paragraph(f"{col}<br/>({units[col]})", style=styles["Normal"]))
+        elif 'TT' in col:  # Example logic to identify temperature columns
+        # Combine column name and unit in a single cell °C
+            header.append(Paragraph(f"{col}<br/>{'(Deg.C)'}", style=styles["Normal"]))
+        elif 'PT' in col:  # Example logic to identify pressure columns
+            header.append(Paragraph(f"{col}<br/>(Bar)", style=styles["Normal"]))
+        elif 'TMF' in col:  # Example logic to identify flow columns
+            header.append(Paragraph(f"{col}<br/>(Kg/Hr)", style=styles["Normal"]))
+        elif 'MTR' in col:  # Example logic to identify pressure columns
+            header.append(Paragraph(f"{col}<br/>(LPH)", style=styles["Normal"]))
+        elif 'OZ' in col:  # Example logic to identify pressure columns
+            header.append(Paragraph(f"{col}<br/>(PPMV)", style=styles["Normal"]))
+        elif 'RLT' in col:  # Example logic to identify pressure columns
+            header.append(Paragraph(f"{col}<br/>(%)", style=styles["Normal"]))
+        elif 'MFM' in col:  # Example logic to identify pressure columns
+            header.append(Paragraph(f"{col}<br/>(LPH)", style=styles["Normal"]))
+        elif 'PH' in col:  # Example logic to identify pressure columns
+            header.append(Paragraph(f"{col}<br/>(pH)", style=styles["Normal"]))
+        else:
+            header.append(Paragraph(col, style=centered_header_style))
+
+    # Add data rows
+    data = [header] + sub_df.values.tolist()
+
+    # Build table
+    table = Table(data, repeatRows=1)  # Repeat the header row
+    style = TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),  # Center all content
+        ('FONTSIZE', (0, 0), (-1, 0), 9),       # Larger font size for column names
+        ('FONTSIZE', (0, 1), (-1, -1), 8),      # Normal font size for data rows
+        ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),  # Center header row vertically
+        ('BACKGROUND', (0, 0), (-1, 0), colors.whitesmoke),  # Background for header row
+        ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),  # Text color
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),     # Grid lines
+        ('BOX', (0, 0), (-1, -1), 1, colors.black),      # Outer border
+        ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),  # Separator line after header
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),   # Background for data rows
+    ])
+
+    table.setStyle(style)
+    return table
+
+
+def _process_doc(output, params, printed_date):
+    # FROM / TO / BATCH ID stacked on the right, title as large as the company name
+    lines = []
+    if params:
+        y0 = PAGE_SIZE[1] - 40*mm
+        param_items = [
+            ("FROM DATE:", params.get('FROM DATE', '')),
+            ("TO DATE:", params.get('TO DATE', '')),
+            ("BATCH ID:", params.get('BATCH ID', 'Not specified'))
+        ]
+        for i, (label, value) in enumerate(param_items):
+            lines.append((150*mm, y0 - (i-2)*5*mm, f"{label} {value}"))
+    return report_doc(output, "Process Parameter Report", lines, params,
+                      printed_date=printed_date, title_size=16, frame_padding=0)
+
+
+# -- parallel rendering -----------------------------------------------------
+_render_pool = None
+_render_pool_workers = 0
+_render_pool_lock = threading.Lock()
+
+
+def _pypdf_available():
+    try:
+        import pypdf  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _get_render_pool(workers):
+    """
+    Worker processes are started once and reused by later reports. They are
+    spawned, not forked: the Streamlit server has threads (and locks held by
+    them) that a forked child would copy in whatever state they were in.
+    """
+    global _render_pool, _render_pool_workers
+    with _render_pool_lock:
+        if _render_pool is None or _render_pool_workers != workers:
+            if _render_pool is not None:
+                _render_pool.shutdown(wait=False)
+            _render_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _render_pool_workers = workers
+        return _render_pool
+
+
+def _render_section(sub_df, params, units, printed_date):
+    """
+    Worker side: one column group as a standalone PDF with the normal header
+    and footer but no page numbers (those need the merged page count).
+    """
+    buffer = BytesIO()
+    doc = _process_doc(buffer, params, printed_date)
+    doc.build([_section_table(sub_df, units)], canvasmaker=Canvas)
+    return buffer.getvalue()
+
+
+def _generate_pdf_parallel(df, sections, params, units, printed_date, workers):
+    from pypdf import PdfReader, PdfWriter
+
+    # sized by `workers` only: a report with fewer sections leaves some idle
+    # rather than restarting the pool
+    pool = _get_render_pool(workers)
+    futures = [pool.submit(_render_section, df[FIXED_COLUMNS + cols], params, units, printed_date)
+               for cols in sections]
+
+    # sections in their original order, so pages come out as in the serial build
+    writer = PdfWriter()
+    for future in futures:
+        for page in PdfReader(BytesIO(future.result())).pages:
+            writer.add_page(page)
+
+    # now that the page count is known, stamp "Page X of Y" where
+    # NumberedCanvas would have put it
+    total_pages = len(writer.pages)
+    stamps = BytesIO()
+    stamp_canvas = Canvas(stamps, pagesize=PAGE_SIZE)
+    for page in range(1, total_pages + 1):
+        stamp_canvas.setFont('Helvetica', 8)
+        stamp_canvas.drawRightString(*NumberedCanvas.page_number_pos,
+                                     NumberedCanvas.page_template.format(page=page, nb=total_pages))
+        stamp_canvas.showPage()
+    stamp_canvas.save()
+    for page, stamp in zip(writer.pages, PdfReader(stamps).pages):
+        page.merge_page(stamp)
+
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
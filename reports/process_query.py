@@ -0,0 +1,207 @@
+# reports/process_query.py
+"""
+SQL for the Process Report.
+
+The historian keeps one row per (DateAndTime, TagIndex) in dbo.FloatTable and
+dbo.StringTable. The report window is applied to the raw tables *before* the
+GROUP BY pivot, so SQL Server only aggregates the rows inside the window.
+Sampling to the report interval also happens here, in SQL, so only one row
+per interval bucket is sent back, and only the tags picked for the report
+are pivoted.
+
+The window is a plain range on DateAndTime, so SQL Server can seek a
+(DateAndTime, TagIndex) index (ProcessIndexes.sql) when there is one; no
+index is forced with a hint, so dropping or renaming it only costs speed.
+"""
+
+# TagIndex -> DisplayName for the sensor tags in dbo.FloatTable,
+# in the order the report shows them.
+PROCESS_TAGS = [
+    (2, 'TT-102'), (3, 'TT-103'), (4, 'TT-104'), (5, 'TT-105'),
+    (6, 'TT-106'), (7, 'TT-107'), (8, 'TT-108'), (9, 'TT-109'),
+    (10, 'TT-110'), (11, 'TT-111'), (12, 'TT-112'), (13, 'TT-113'),
+    (14, 'TT-114'), (15, 'TT-130'), (16, 'TT-506'),
+    (17, 'PT-118'), (18, 'PT-119'), (19, 'PT-120'), (20, 'PT-121'),
+    (21, 'PT-122'), (22, 'PT-123'), (23, 'PT-124'), (24, 'PT-125'),
+    (25, 'PT-128'),
+    (26, 'TMF-101'), (27, 'TMF-102'), (28, 'TMF-103'), (29, 'TMF-104'),
+    (30, 'TMF-105'), (31, 'TMF-106'), (32, 'TMF-107'), (33, 'TMF-108'),
+    (34, 'MTR-101'), (35, 'MTR-102'), (36, 'MTR-103'), (37, 'MTR-104'),
+    (38, 'MTR-105'), (39, 'MTR-106'), (40, 'MTR-107'), (41, 'MTR-108'),
+    (42, 'MTR-109'),
+    (43, 'RLT-101'), (44, 'MFM-101'), (45, 'pH-101'), (46, 'pH-102'),
+    (47, 'OZ-101'),
+]
+
+# How a sampling bucket is reduced to one row. 'first' keeps the earliest
+# logged row of the bucket, the others aggregate every row in it.
+SAMPLE_AGGREGATES = {
+    'first': None,
+    'avg': 'AVG',
+    'min': 'MIN',
+    'max': 'MAX',
+}
+
+# Where the long -> wide pivot happens, per "engine" in the db_config.json
+# "Process" entry: in SQL Server (build_report_query), or in pandas on the raw
+# (DateAndTime, TagIndex, Val) rows (build_long_queries + tag_store).
+REPORT_ENGINES = ('pivot', 'long')
+
+def quote_name(name):
+    """Bracket-quote an identifier for T-SQL."""
+    return "[" + str(name).replace("]", "]]") + "]"
+
+
+def resolve_tags(selected_tags, catalog=None):
+    """
+    Map the selected display names to [(TagIndex, DisplayName), ...] using
+    `catalog` (default PROCESS_TAGS), keeping the selection order. Unknown
+    names are an error, so nothing from the UI ever ends up in the SQL text.
+    """
+    by_name = {name: idx for idx, name in (catalog or PROCESS_TAGS)}
+    unknown = [t for t in selected_tags if t not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown tag(s): {', '.join(map(str, unknown))}")
+    seen = set()
+    tags = []
+    for name in selected_tags:
+        if name not in seen:
+            seen.add(name)
+            tags.append((by_name[name], name))
+    return tags
+
+
+def build_report_query(start_datetime, end_datetime, selected_tags,
+                       interval=1, aggregation='first', catalog=None):
+    """
+    Return (sql, params) for the pivoted process data of `selected_tags`
+    between start_datetime and end_datetime (inclusive), one row per
+    `interval` minutes. `catalog` is the [(TagIndex, DisplayName)] list
+    from the tag catalogue. Buckets are counted from start_datetime, so any interval gives
+    evenly spaced rows; `aggregation` is one of SAMPLE_AGGREGATES.
+    """
+    if aggregation not in SAMPLE_AGGREGATES:
+        raise ValueError(f"Unknown aggregation '{aggregation}'")
+    interval = int(interval)
+    if interval < 1:
+        raise ValueError("Interval must be at least 1 minute")
+    tags = resolve_tags(selected_tags, catalog)
+    if not tags:
+        raise ValueError("No tags selected")
+
+    # TagIndex values come from PROCESS_TAGS (ints), the IN list is parameterised
+    tag_names = [quote_name(name) for _, name in tags]
+    pivot_cols = ",\n".join(
+        f"          MAX(CASE WHEN TagIndex = {int(idx)} THEN Val END) AS {quote_name(name)}"
+        for idx, name in tags
+    )
+    joined_cols = ", ".join(f"f.{name}" for name in tag_names)
+    tag_marks = ", ".join("?" for _ in tags)
+
+    func = SAMPLE_AGGREGATES[aggregation]
+    if func is None:
+        sampled = f"""
+      Ranked AS (
+        SELECT *,
+          ROW_NUMBER() OVER (PARTITION BY Bucket ORDER BY DateAndTime) AS rn
+        FROM Joined
+      )
+    SELECT
+      Bucket AS DateAndTime,
+      [Batch ID],
+      [User ID],
+      {", ".join(tag_names)}
+    FROM Ranked
+    WHERE rn = 1
+    ORDER BY Bucket;"""
+    else:
+        agg_cols = ", ".join(f"{func}({name}) AS {name}" for name in tag_names)
+        sampled = f"""
+      Grouped AS (
+        SELECT
+          Bucket,
+          MAX([Batch ID]) AS [Batch ID],
+          MAX([User ID]) AS [User ID],
+          {agg_cols}
+        FROM Joined
+        GROUP BY Bucket
+      )
+    SELECT
+      Bucket AS DateAndTime,
+      [Batch ID],
+      [User ID],
+      {", ".join(tag_names)}
+    FROM Grouped
+    ORDER BY Bucket;"""
+
+    sql = f"""
+    WITH
+      StringPivot AS (
+        SELECT
+          DateAndTime,
+          MAX(CASE WHEN TagIndex = 1 THEN Val END) AS [Batch ID],
+          MAX(CASE WHEN TagIndex = 0 THEN Val END) AS [User ID]
+        FROM dbo.StringTable
+        WHERE DateAndTime BETWEEN ? AND ?
+          AND TagIndex IN (0,1)
+        GROUP BY DateAndTime
+      ),
+      FloatPivot AS (
+        SELECT
+          DateAndTime,
+{pivot_cols}
+        FROM dbo.FloatTable
+        WHERE DateAndTime BETWEEN ? AND ?
+          AND TagIndex IN ({tag_marks})
+        GROUP BY DateAndTime
+      ),
+      Joined AS (
+        SELECT
+          DATEADD(MINUTE,
+                  (DATEDIFF(MINUTE, ?, s.DateAndTime) / {interval}) * {interval},
+                  ?) AS Bucket,
+          s.DateAndTime,
+          s.[Batch ID],
+          s.[User ID],
+          {joined_cols}
+        FROM StringPivot AS s
+        INNER JOIN FloatPivot AS f
+          ON s.DateAndTime = f.DateAndTime
+      ),{sampled}
+    """
+    # buckets start on whole minutes counted from the window start
+    origin = start_datetime.replace(second=0, microsecond=0)
+    params = [start_datetime, end_datetime,
+              start_datetime, end_datetime, *[idx for idx, _ in tags],
+              origin, origin]
+    return sql, params
+
+
+def build_long_queries(start_datetime, end_datetime, selected_tags, catalog=None):
+    """
+    Return (tags, (float_sql, float_params), (string_sql, string_params)) for
+    the raw rows of the window: sensor readings of only `selected_tags` and
+    the Batch ID / User ID strings. Nothing is grouped or sampled in SQL;
+    tag_store.pivot_report does that locally.
+    """
+    tags = resolve_tags(selected_tags, catalog)
+    if not tags:
+        raise ValueError("No tags selected")
+
+    tag_marks = ", ".join("?" for _ in tags)
+
+    float_sql = f"""
+    SELECT DateAndTime, TagIndex, Val
+    FROM dbo.FloatTable
+    WHERE DateAndTime BETWEEN ? AND ?
+      AND TagIndex IN ({tag_marks});
+    """
+    string_sql = """
+    SELECT DateAndTime, TagIndex, Val
+    FROM dbo.StringTable
+    WHERE DateAndTime BETWEEN ? AND ?
+      AND TagIndex IN (0,1);
+    """
+    return (tags,
+            (float_sql, [start_datetime, end_datetime, *[idx for idx, _ in tags]]),
+            (string_sql, [start_datetime, end_datetime]))
@@ -0,0 +1,171 @@
+# reports/report_doc.py
+"""
+Page layout shared by the Process, Alarm and Audit reports.
+
+Header (logo, company name, report title, FROM/TO lines) and footer
+(Printed By, Printed Date, Verified By) are the same on every page of a
+report, so they are drawn once per document into a form XObject and each
+page only places that form. The logo is decoded once per process and
+embedded once per PDF; the Printed Date is fixed when the document is
+created. Page numbers are still NumberedCanvas's job.
+
+    doc = report_doc(output, "Audit Report", date_range_lines(params), params)
+    doc.build(story, canvasmaker=NumberedCanvas)
+"""
+import os
+from datetime import datetime
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate
+
+from .latest_user import NO_USER
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOGO_PATH = os.path.join(APP_ROOT, 'alivus_logo.png')
+LOGO_SIZE = 60
+COMPANY_NAME = "ALIVUS LIFE SCIENCES LIMITED ANKLESHWAR"
+
+PAGE_SIZE = A4
+LEFT_MARGIN = 10*mm
+RIGHT_MARGIN = 10*mm
+TOP_MARGIN = 50*mm   # room for the header
+BOTTOM_MARGIN = 20*mm
+
+PAGE_FORM = 'reportPage'
+
+
+@lru_cache(maxsize=1)
+def _logo():
+    """The decoded logo, or None if it can't be read (the header goes without)."""
+    try:
+        logo = ImageReader(LOGO_PATH)
+        logo.getRGBData()   # decode now, not on the first page of every thread
+        return logo
+    except Exception:
+        return None
+
+
+def date_range_lines(params, x=120*mm):
+    """FROM/TO lines under the title, as the Alarm and Audit reports print them."""
+    if not params:
+        return []
+    y0 = PAGE_SIZE[1] - 40*mm
+    return [(x, y0, f"FROM DATE: {params.get('FROM DATE','')}"),
+            (x, y0 - 5*mm, f"TO DATE:   {params.get('TO DATE','')}")]
+
+
+class ReportDoc(BaseDocTemplate):
+    """
+    One frame between the margins, and one page template whose onPage
+    places the prebuilt header/footer form.
+    """
+
+    def __init__(self, output, title, header_lines=(), printed_by=NO_USER,
+                 printed_date=None, title_size=14, frame_padding=6, **kw):
+        super().__init__(output, pagesize=PAGE_SIZE,
+                         leftMargin=LEFT_MARGIN, rightMargin=RIGHT_MARGIN,
+                         topMargin=TOP_MARGIN, bottomMargin=BOTTOM_MARGIN, **kw)
+        self.title = title
+        self.title_size = title_size
+        self.header_lines = list(header_lines)
+        self.printed_by = printed_by
+        self.printed_date = printed_date or datetime.now().strftime('%d/%m/%Y %H:%M')
+
+        # the date is centred on its own width, then shifted left by 10mm
+        width, height = self.pagesize
+        self._date_x = width/2 - stringWidth(self.printed_date, 'Helvetica', 8)/2 - 10*mm
+        self._form_canvas = None
+
+        frame = Frame(LEFT_MARGIN, BOTTOM_MARGIN,
+                      width - LEFT_MARGIN - RIGHT_MARGIN, height - TOP_MARGIN - BOTTOM_MARGIN,
+                      leftPadding=frame_padding, rightPadding=frame_padding,
+                      topPadding=frame_padding, bottomPadding=frame_padding,
+                      id='normal')
+        self.addPageTemplates([PageTemplate(id='all', frames=[frame], onPage=self._on_page)])
+
+    def _on_page(self, canvas, doc):
+        if self._form_canvas is not canvas:
+            # first page of this build: record header + footer once
+            canvas.beginForm(PAGE_FORM)
+            self._draw_header(canvas)
+            self._draw_footer(canvas)
+            canvas.endForm()
+            self._form_canvas = canvas
+        canvas.doForm(PAGE_FORM)
+
+    def _draw_header(self, canvas):
+        width, height = self.pagesize
+        logo = _logo()
+        if logo is not None:
+            canvas.drawImage(logo, 15*mm, height - 25*mm, LOGO_SIZE, LOGO_SIZE, mask='auto')
+
+        canvas.setFont('Helvetica-Bold', 16)
+        canvas.drawCentredString(width/2, height - 20*mm, COMPANY_NAME)
+
+        canvas.setFont('Helvetica-Bold', self.title_size)
+        canvas.drawCentredString(width/2, height - 32*mm, self.title)
+
+        canvas.setFont('Helvetica', 9)
+        for x, y, text in self.header_lines:
+            canvas.drawString(x, y, text)
+
+    def _draw_footer(self, canvas):
+        canvas.setFont('Helvetica', 8)
+        canvas.drawString(10*mm, 10*mm, f"Printed By: {self.printed_by}")
+        canvas.drawString(self._date_x, 10*mm, f"Printed Date: {self.printed_date}")
+        # "Page X of Y" goes at 150mm, see NumberedCanvas
+        canvas.drawString(170*mm, 10*mm, "Verified By: ")
+
+
+def report_doc(output, title, header_lines=(), params=None, **kw):
+    """ReportDoc for `output` (a path or binary file object), Printed By from params."""
+    printed_by = (params or {}).get('Printed By', NO_USER)
+    return ReportDoc(output, title, header_lines, printed_by, **kw)
+
+
+class NumberedCanvas(Canvas):
+    """
+    Canvas that stamps "Page X of Y" on every page.
+
+    Y is only known once the last page is done, so each page draws a tiny
+    form XObject ("pageNumberX") as a placeholder and the forms are filled
+    in at save(). No copy of the page state is kept for the footer, which
+    more than halves peak memory, but it still grows with the page count:
+    reportlab's PDFDocument holds every page stream until save() writes
+    the file.
+    """
+    # your little template: you could even make this configurable
+    page_template = "Page {page} of {nb}"
+    page_number_pos = (150 * mm, 10 * mm)   # right edge of the text
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._page_count = 0
+
+    def showPage(self):
+        self._page_count += 1
+        # placeholder for this page's footer, drawn at save()
+        self.saveState()
+        self.translate(*self.page_number_pos)
+        self.doForm(f"pageNumber{self._page_count}")
+        self.restoreState()
+        super().showPage()
+
+    def save(self):
+        # now we know how many pages we actually made
+        total_pages = self._page_count
+        for page in range(1, total_pages + 1):
+            # fill in the {page} and {nb}; the form's origin is the right edge
+            self.beginForm(f"pageNumber{page}",
+                           lowerx=-100 * mm, lowery=-2 * mm, upperx=0, uppery=5 * mm)
+            self.setFont('Helvetica', 8)
+            self.drawRightString(0, 0, self.page_template.format(page=page, nb=total_pages))
+            self.endForm()
+
+        # all pages done, write out the file
+        super().save()
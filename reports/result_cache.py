@@ -0,0 +1,272 @@
+# reports/result_cache.py
+"""
+On-disk, time-partitioned cache of historian query results.
+
+Operators re-run the same reports over overlapping windows all day. Data for a
+past hour (or day) never changes, so each *closed* partition is fetched from
+SQL Server once and kept as a Parquet file:
+
+    <dir>/<report type>/<query signature>/<partition start>.parquet
+
+A request is split into partitions. Closed partitions that lie wholly inside
+the request come from disk, missing ones are fetched in as few range queries
+as possible and stored. The partial partitions at either end of the request
+and the open (current) partition are always fetched live and never stored,
+so a sampling bucket is never cut short or stretched by a partition edge.
+Sampled reports are only cached when their start is on the partitions'
+bucket grid (see aligned()); otherwise the buckets, counted from the report
+start, would not match the stored ones.
+
+Off by default; enabled per db_config.json entry:
+
+    "result_cache": {"enabled": true, "dir": ".report_cache",
+                     "partition": "hour", "grace_minutes": 5,
+                     "max_age_days": 30}
+
+A relative "dir" is taken from the app folder. Partition files older than
+"max_age_days" are deleted (checked at most once an hour), so tag sets or
+intervals nobody asks for any more don't pile up.
+
+Needs pyarrow; without it every request goes straight to the database.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time as _time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARTITIONS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+DEFAULT_CACHE_SETTINGS = {
+    'enabled': False,
+    'dir': '.report_cache',
+    'partition': 'hour',
+    # a partition counts as closed this long after it ends, so rows the
+    # historian writes a little late are not missed
+    'grace_minutes': 5,
+    'max_age_days': 30,
+}
+
+SWEEP_EVERY_SECONDS = 3600
+
+
+def _parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class PartitionedCache:
+    def __init__(self, root, partition='hour', grace_minutes=5, clock=datetime.now,
+                 max_age_days=None):
+        if partition not in PARTITIONS:
+            raise ValueError(f"Unknown cache partition '{partition}'")
+        self.root = root
+        self.partition = partition
+        self.size = PARTITIONS[partition]
+        self.grace = timedelta(minutes=grace_minutes)
+        self.clock = clock
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._swept_at = None
+        self.stats = {'hits': 0, 'stored': 0, 'db_queries': 0, 'evicted': 0}
+
+    def floor(self, ts):
+        ts = ts.replace(minute=0, second=0, microsecond=0)
+        if self.partition == 'day':
+            ts = ts.replace(hour=0)
+        return ts
+
+    def aligned(self, step_minutes, start=None):
+        """
+        True if sampling buckets of `step_minutes` never straddle a partition
+        and, counted from `start`, fall on the same grid as buckets counted
+        from each partition start (which is how stored partitions were built).
+        """
+        if (self.size.total_seconds() / 60) % step_minutes:
+            return False
+        if start is None:
+            return True
+        # bucket origins are whole minutes (see process_query.build_report_query)
+        offset = (start.replace(second=0, microsecond=0) - self.floor(start)).total_seconds() / 60
+        return offset % step_minutes == 0
+
+    def _path(self, signature, part_start):
+        return os.path.join(self.root, signature, part_start.strftime('%Y%m%d%H') + '.parquet')
+
+    def _read(self, signature, part_start):
+        path = self._path(signature, part_start)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            # half-written or corrupt file: refetch it
+            return None
+
+    def _write(self, signature, part_start, df):
+        path = self._path(signature, part_start)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        try:
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    @staticmethod
+    def _before(df, time_col, limit):
+        if df.empty:
+            return df
+        return df[pd.to_datetime(df[time_col]) < limit]
+
+    def _sweep(self):
+        """Delete partition files older than max_age_days, at most once an hour."""
+        if not self.max_age_days:
+            return
+        with self._lock:
+            now = _time.monotonic()
+            if self._swept_at is not None and now - self._swept_at < SWEEP_EVERY_SECONDS:
+                return
+            self._swept_at = now
+        cutoff = _time.time() - self.max_age_days * 86400
+        evicted = 0
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(folder, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        evicted += 1
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self.stats['evicted'] += evicted
+
+    def _fetch(self, fetch_range, range_start, range_end):
+        with self._lock:
+            self.stats['db_queries'] += 1
+        return fetch_range(range_start, range_end)
+
+    def fetch(self, signature, start, end, fetch_range, time_col):
+        """
+        Rows with start <= time_col <= end. `fetch_range(a, b)` runs the real
+        query for a..b (inclusive) and returns a DataFrame with `time_col`.
+        """
+        now = self.clock()
+        # partitions wholly inside start..end that can no longer change
+        closed = []
+        p = self.floor(start)
+        if p < start:
+            p += self.size
+        while p + self.size <= end and p + self.size + self.grace <= now:
+            closed.append(p)
+            p += self.size
+        if not closed:
+            return self._fetch(fetch_range, start, end)
+
+        frames = []
+        if start < closed[0]:
+            # head of a partition: live, up to (not including) the first stored one
+            frames.append(self._before(self._fetch(fetch_range, start, closed[0]),
+                                       time_col, closed[0]))
+        missing = []
+        for p in closed:
+            df = self._read(signature, p)
+            if df is None:
+                missing.append(p)
+            else:
+                with self._lock:
+                    self.stats['hits'] += 1
+                frames.append(df)
+
+        # consecutive missing partitions -> one query, then split for storage
+        for run in _runs(missing, self.size):
+            run_end = run[-1] + self.size
+            df = self._fetch(fetch_range, run[0], run_end)
+            ts = pd.to_datetime(df[time_col]) if not df.empty else None
+            for p in run:
+                if ts is None:
+                    part = df.iloc[0:0]
+                else:
+                    part = df[(ts >= p) & (ts < p + self.size)]
+                self._write(signature, p, part)
+                with self._lock:
+                    self.stats['stored'] += 1
+                frames.append(part)
+
+        tail = closed[-1] + self.size
+        if tail <= end:
+            # rest of the window, including the open partition: live, never stored
+            frames.append(self._fetch(fetch_range, tail, end))
+        self._sweep()
+
+        non_empty = [f for f in frames if not f.empty]
+        if not non_empty:
+            # keep the column layout of whatever came back
+            return frames[0].iloc[0:0] if frames else pd.DataFrame()
+        # every piece is already inside start..end
+        df = pd.concat(non_empty, ignore_index=True)
+        return df.sort_values(time_col, kind='stable').reset_index(drop=True)
+
+
+def _runs(parts, size):
+    run = []
+    for p in parts:
+        if run and p != run[-1] + size:
+            yield run
+            run = []
+        run.append(p)
+    if run:
+        yield run
+
+
+# (dir, partition, grace, clock) -> PartitionedCache
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(config, db_name, report_type, clock=datetime.now):
+    """The cache for one report type, or None when it is disabled."""
+    db_config = config.get(db_name, {})
+    settings = dict(DEFAULT_CACHE_SETTINGS, **db_config.get('result_cache', {}))
+    if not settings['enabled'] or not _parquet_available():
+        return None
+    root = os.path.join(APP_ROOT, settings['dir'], report_type)
+    key = (root, settings['partition'], settings['grace_minutes'], clock,
+           settings['max_age_days'])
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = PartitionedCache(
+                root, settings['partition'], settings['grace_minutes'], clock,
+                settings['max_age_days'])
+    return cache
+
+
+def cached_fetch(config, db_name, report_type, signature, start, end,
+                 fetch_range, time_col, clock=datetime.now, step_minutes=1):
+    """
+    Run `fetch_range(start, end)` through the partition cache of `report_type`.
+    `signature` is anything identifying the query (tags, interval, ...);
+    `clock` is "now" in the same time zone as `time_col`.
+    """
+    cache = get_result_cache(config, db_name, report_type, clock)
+    if cache is None or not cache.aligned(step_minutes, start):
+        return fetch_range(start, end)
+    db_config = config.get(db_name, {})
+    ident = repr((db_config.get('server'), db_config.get('database'), signature))
+    digest = hashlib.sha1(ident.encode('utf-8')).hexdigest()[:16]
+    return cache.fetch(digest, start, end, fetch_range, time_col)
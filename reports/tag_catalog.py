@@ -0,0 +1,118 @@
+# reports/tag_catalog.py
+"""
+Tag catalogue for the Process Report: TagIndex, DisplayName and Unit of every
+sensor tag in dbo.FloatTable.
+
+Loaded once per process and shared by all Streamlit sessions, so reruns
+(every keystroke in the form) never touch the database. Where it comes from,
+in order, for the "Process" entry of db_config.json:
+
+    "tags": [{"index": 2, "name": "TT-102", "unit": "Deg.C"}, ...]
+    "tag_table": "dbo.TagCatalog"   -- columns TagIndex, DisplayName, Unit
+    built-in PROCESS_TAGS           -- the fixed plant tag list
+
+"tag_cache_ttl" (seconds, default 3600) sets how long it is kept before
+being reloaded; invalidate_tag_catalog() drops it immediately.
+"""
+import threading
+import time as _time
+
+import pandas as pd
+
+from .db_pool import pooled_connection
+from .process_query import PROCESS_TAGS, quote_name
+
+DEFAULT_TAG_CACHE_TTL = 3600
+
+# display-name prefix -> unit shown under the column name in the PDF
+UNIT_PREFIXES = [
+    ('TT', 'Deg.C'),
+    ('PT', 'Bar'),
+    ('TMF', 'Kg/Hr'),
+    ('MTR', 'LPH'),
+    ('OZ', 'PPMV'),
+    ('RLT', '%'),
+    ('MFM', 'LPH'),
+    ('PH', 'pH'),
+]
+
+CATALOG_COLUMNS = ['TagIndex', 'DisplayName', 'Unit']
+
+_lock = threading.Lock()
+_cache = {}   # 'Process' config key -> (loaded_at, DataFrame)
+
+
+def default_unit(name):
+    upper = name.upper()
+    for prefix, unit in UNIT_PREFIXES:
+        if upper.startswith(prefix):
+            return unit
+    return ''
+
+
+def _from_config(tags):
+    rows = [(int(t['index']), str(t['name']), t.get('unit') or default_unit(t['name']))
+            for t in tags]
+    return pd.DataFrame(rows, columns=CATALOG_COLUMNS)
+
+
+def _from_table(config, table):
+    table_sql = ".".join(quote_name(part) for part in table.split("."))
+    query = f"SELECT TagIndex, DisplayName, Unit FROM {table_sql} ORDER BY TagIndex;"
+    with pooled_connection(config, 'Process') as conn:
+        rows = conn.cursor().execute(query).fetchall()
+    return pd.DataFrame(
+        [(int(i), str(n), u or default_unit(str(n))) for i, n, u in rows],
+        columns=CATALOG_COLUMNS)
+
+
+def _builtin():
+    return pd.DataFrame([(i, n, default_unit(n)) for i, n in PROCESS_TAGS],
+                        columns=CATALOG_COLUMNS)
+
+
+def _load(config):
+    db_config = config.get('Process', {})
+    if db_config.get('tags'):
+        return _from_config(db_config['tags'])
+    if db_config.get('tag_table'):
+        return _from_table(config, db_config['tag_table'])
+    return _builtin()
+
+
+def _cache_key(config):
+    db_config = config.get('Process', {})
+    return (db_config.get('server'), db_config.get('database'),
+            repr(db_config.get('tags')), db_config.get('tag_table'))
+
+
+def get_tag_catalog(config):
+    """DataFrame [TagIndex, DisplayName, Unit], ordered by TagIndex."""
+    ttl = config.get('Process', {}).get('tag_cache_ttl', DEFAULT_TAG_CACHE_TTL)
+    key = _cache_key(config)
+    with _lock:
+        hit = _cache.get(key)
+        if hit and _time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        # load under the lock so concurrent sessions share one query
+        catalog = _load(config).sort_values('TagIndex').reset_index(drop=True)
+        _cache[key] = (_time.monotonic(), catalog)
+        return catalog
+
+
+def invalidate_tag_catalog():
+    """Forget the cached catalogue; the next call reloads it."""
+    with _lock:
+        _cache.clear()
+
+
+def tag_pairs(config):
+    """[(TagIndex, DisplayName), ...] for the query builder."""
+    catalog = get_tag_catalog(config)
+    return list(zip(catalog['TagIndex'].tolist(), catalog['DisplayName'].tolist()))
+
+
+def tag_units(config):
+    """{DisplayName: Unit} for the PDF column headers."""
+    catalog = get_tag_catalog(config)
+    return dict(zip(catalog['DisplayName'], catalog['Unit']))
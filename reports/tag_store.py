@@ -0,0 +1,150 @@
+# reports/tag_store.py
+"""
+The "long" Process Report engine: SQL Server only filters, pandas/NumPy pivot.
+
+Instead of one MAX(CASE ...) column per tag computed on the shared SQL
+Express instance, the raw (DateAndTime, TagIndex, Val) rows of the picked
+tags are fetched into compact arrays (datetime64, int32, float32 - Val is
+a REAL in FloatTable, so float32 loses nothing) and reshaped here:
+
+    readings -> one row per timestamp, one column per tag (MAX on repeats)
+    strings  -> Batch ID / User ID per timestamp
+    inner join on DateAndTime, then one row per `interval` bucket
+
+The result has the same columns and rows as build_report_query's, so the
+rest of the report doesn't care which engine ran. Enabled per db_config.json
+entry with "engine": "long" (default "pivot").
+"""
+import numpy as np
+import pandas as pd
+
+from .fetch import DEFAULT_BATCH_SIZE, iter_cursor_frames
+from .process_query import SAMPLE_AGGREGATES, build_long_queries
+
+BATCH_TAG = 1   # StringTable TagIndex of the Batch ID
+USER_TAG = 0    # ... and of the User ID
+
+
+def fetch_long(conn, query, params, batch_size=DEFAULT_BATCH_SIZE):
+    """(times datetime64[ns], tags int32, values float32) for a raw-row query."""
+    times, tags, values = [], [], []
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        for frame in iter_cursor_frames(cursor, batch_size):
+            # downcast each batch right away, so only the compact copy is kept
+            times.append(frame['DateAndTime'].to_numpy('datetime64[ns]'))
+            tags.append(frame['TagIndex'].to_numpy('int32'))
+            values.append(frame['Val'].to_numpy('float32'))
+    finally:
+        cursor.close()
+    if not times:
+        return (np.empty(0, 'datetime64[ns]'), np.empty(0, 'int32'), np.empty(0, 'float32'))
+    return np.concatenate(times), np.concatenate(tags), np.concatenate(values)
+
+
+def fetch_long_strings(conn, query, params, batch_size=DEFAULT_BATCH_SIZE):
+    """Raw StringTable rows as one DataFrame [DateAndTime, TagIndex, Val]."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        frames = list(iter_cursor_frames(cursor, batch_size))
+    finally:
+        cursor.close()
+    if not frames:
+        return pd.DataFrame({'DateAndTime': pd.Series(dtype='datetime64[ns]'),
+                             'TagIndex': pd.Series(dtype='int32'),
+                             'Val': pd.Series(dtype=object)})
+    return pd.concat(frames, ignore_index=True)
+
+
+def pivot_readings(times, tag_idx, values, tags):
+    """
+    Wide float32 matrix (sorted unique timestamps x `tags`), NaN where a tag
+    has no reading; repeated (time, tag) rows keep the largest value, like
+    MAX(CASE ...) did.
+    """
+    codes, stamps = pd.factorize(times, sort=True)
+    lut = np.full(max([idx for idx, _ in tags] + [0]) + 1, -1, dtype='int32')
+    for pos, (idx, _) in enumerate(tags):
+        lut[idx] = pos
+    cols = lut[tag_idx]
+
+    wide = np.full((len(stamps), len(tags)), np.nan, dtype='float32')
+    keep = ~np.isnan(values) & (cols >= 0)
+    codes, cols, values = codes[keep], cols[keep], values[keep]
+    # assign in ascending value order: for repeats the largest is written last
+    order = np.argsort(values, kind='stable')
+    wide[codes[order], cols[order]] = values[order]
+    return np.asarray(stamps, dtype='datetime64[ns]'), wide
+
+
+def pivot_strings(strings):
+    """Batch ID / User ID per timestamp, indexed by DateAndTime."""
+    if strings.empty:
+        return pd.DataFrame(columns=['Batch ID', 'User ID'],
+                            index=pd.DatetimeIndex([], name='DateAndTime'))
+    wide = (strings.dropna(subset=['Val'])
+            .groupby(['DateAndTime', 'TagIndex'])['Val'].max()
+            .unstack('TagIndex'))
+    wide = wide.reindex(columns=[BATCH_TAG, USER_TAG])
+    wide.columns = ['Batch ID', 'User ID']
+    # timestamps where both strings were NULL still count for the join
+    stamps = pd.DatetimeIndex(strings['DateAndTime'].unique(), name='DateAndTime')
+    return wide.reindex(stamps.sort_values())
+
+
+def pivot_report(stamps, wide, strings, tags, start_datetime, interval=1, aggregation='first'):
+    """
+    Join, bucket and sample like build_report_query: rows whose timestamp
+    has both readings and strings, one row per `interval` minutes counted
+    from the start minute, 'first' row or AVG/MIN/MAX per bucket.
+    """
+    if aggregation not in SAMPLE_AGGREGATES:
+        raise ValueError(f"Unknown aggregation '{aggregation}'")
+    interval = int(interval)
+    if interval < 1:
+        raise ValueError("Interval must be at least 1 minute")
+    names = [name for _, name in tags]
+
+    # INNER JOIN on DateAndTime
+    both, in_wide, in_strings = np.intersect1d(
+        stamps, strings.index.to_numpy('datetime64[ns]'), assume_unique=True,
+        return_indices=True)
+    values = wide[in_wide].astype('float64')
+    batch = strings['Batch ID'].to_numpy(object)[in_strings]
+    user = strings['User ID'].to_numpy(object)[in_strings]
+
+    # Bucket = origin + whole minutes since origin, rounded down to the interval
+    origin = np.datetime64(start_datetime.replace(second=0, microsecond=0), 'ns')
+    minutes = (both - origin) // np.timedelta64(1, 'm')
+    bucket = origin + (minutes // interval * interval).astype('timedelta64[m]')
+
+    func = SAMPLE_AGGREGATES[aggregation]
+    if func is None:
+        # rows are in time order, so the first row of each bucket is the earliest
+        _, first = np.unique(bucket, return_index=True)
+        df = pd.DataFrame(values[first], columns=names)
+        df.insert(0, 'User ID', user[first])
+        df.insert(0, 'Batch ID', batch[first])
+        df.insert(0, 'DateAndTime', bucket[first])
+        return df
+
+    grouped = pd.DataFrame(values, columns=names).groupby(bucket, sort=True)
+    df = getattr(grouped, {'AVG': 'mean', 'MIN': 'min', 'MAX': 'max'}[func])()
+    labels = pd.DataFrame({'Batch ID': batch, 'User ID': user}).groupby(bucket, sort=True).max()
+    df.insert(0, 'User ID', labels['User ID'].to_numpy(object))
+    df.insert(0, 'Batch ID', labels['Batch ID'].to_numpy(object))
+    df.insert(0, 'DateAndTime', df.index.to_numpy('datetime64[ns]'))
+    return df.reset_index(drop=True)
+
+
+def read_long_report(conn, start_datetime, end_datetime, selected_tags,
+                     interval=1, aggregation='first', catalog=None,
+                     batch_size=DEFAULT_BATCH_SIZE):
+    """Same frame as read_frame(build_report_query(...)), pivoted locally."""
+    tags, (float_sql, float_params), (string_sql, string_params) = build_long_queries(
+        start_datetime, end_datetime, selected_tags, catalog)
+    stamps, wide = pivot_readings(*fetch_long(conn, float_sql, float_params, batch_size), tags)
+    strings = pivot_strings(fetch_long_strings(conn, string_sql, string_params, batch_size))
+    return pivot_report(stamps, wide, strings, tags, start_datetime, interval, aggregation)
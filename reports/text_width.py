@@ -0,0 +1,53 @@
+# reports/text_width.py
+"""
+Column-width measurement for the report tables.
+
+stringWidth itself is cheap once the font is loaded; what was slow was
+making a throw-away Canvas per cell and measuring every cell of every row.
+Here each distinct (text, font, size) is measured once per process, a
+column is reduced to its distinct strings first, and very large columns
+are cut down to the candidates that can actually decide the width.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# above this many distinct strings a column is sampled
+MAX_MEASURED_STRINGS = 2000
+
+
+@lru_cache(maxsize=65536)
+def text_width(text, font_name='Helvetica', font_size=7):
+    """Width in points of `text` set in `font_name` at `font_size`."""
+    return stringWidth(text, font_name, font_size)
+
+
+def column_text_width(values, font_name='Helvetica', font_size=7,
+                      percentile=100, max_strings=MAX_MEASURED_STRINGS):
+    """
+    Width of a column of values as text: the widest one (percentile=100) or
+    the given percentile of the distinct values' widths, so a handful of
+    outliers doesn't blow up the layout.
+
+    With more than `max_strings` distinct values only some are measured:
+    for the maximum, the longest ones by character count (the widest string
+    is practically always among them); for a percentile, a fixed random
+    sample.
+    """
+    texts = pd.Series(pd.unique(pd.Series(values).astype(str)))
+    if texts.empty:
+        return 0.0
+    if len(texts) > max_strings:
+        if percentile >= 100:
+            lengths = texts.str.len().to_numpy()
+            keep = np.argpartition(lengths, -max_strings)[-max_strings:]
+        else:
+            keep = np.random.default_rng(0).choice(len(texts), max_strings, replace=False)
+        texts = texts.iloc[keep]
+    widths = np.fromiter((text_width(t, font_name, font_size) for t in texts),
+                         dtype='float64', count=len(texts))
+    if percentile >= 100:
+        return float(widths.max())
+    return float(np.percentile(widths, percentile))